@@ -87,8 +87,8 @@ def example_4_validate_connection():
 
     client = ZhipuAPIClient(config)
 
-    # 验证配置和连接
-    if client.validate_config():
+    # 验证配置和连接（probe=True 发送真实请求验证连通性）
+    if client.validate_config(probe=True):
         print("✓ API 连接正常，可以开始使用")
 
         # 列出可用的模型
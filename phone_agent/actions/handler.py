@@ -1,10 +1,21 @@
 """Action handler for processing AI model outputs."""
 
+import ast
+import json
+import logging
+import re
 import time
 from dataclasses import dataclass
 from typing import Any, Callable
 
+try:
+    # 可选加速: orjson 的 C 实现解析小 JSON 比标准库快数倍
+    import orjson
+except ImportError:
+    orjson = None
+
 from phone_agent.adb import (
+    AdbShellSession,
     back,
     clear_text,
     detect_and_set_adb_keyboard,
@@ -12,14 +23,62 @@ from phone_agent.adb import (
     home,
     launch_app,
     long_press,
+    multi_tap,
     restore_keyboard,
     swipe,
     tap,
     type_text,
+    wait_for_ime,
+)
+
+
+# Precompiled patterns for parse_action (compiled once at import, not per call).
+# One alternation pass strips every known wrapper tag instead of a chain of
+# str.replace calls that each re-scan and re-copy the whole response.
+_TAG_SUB_RE = re.compile(
+    r"<\|begin_of_box\|>|<\|end_of_box\|>|\{think\}|\{action\}|</s>"
+    r"|</?think>|</?answer>|answer>|<tool_call>"
 )
+_DO_RE = re.compile(r"(do\([^\n\r]*\))")
+_FINISH_RE = re.compile(r"(finish\([^\n\r]*\))")
+_DICT_RE = re.compile(r"\{[^}]+\}")
+_KV_LIST_RE = re.compile(r"(\w+)=(\[[^\]]+\])")
+_KV_STR_RE = re.compile(r'(\w+)="([^"]+)"')
+_KV_BARE_RE = re.compile(r"(\w+)=([^,}\s\[]+)")
+_SIMPLE_CALL_RE = re.compile(r"\A(?:do|finish)\([^\n]*\)\Z")
+_DURATION_CN_RE = re.compile(r"(\d+)\s*秒")
+_DURATION_EN_RE = re.compile(r"(\d+)\s*seconds?", re.IGNORECASE)
 
+_json_loads = orjson.loads if orjson is not None else json.loads
 
-@dataclass
+log = logging.getLogger(__name__)
+
+# 模板占位符行，O(1) 拒绝
+_PLACEHOLDERS = frozenset({"{action}", "{think}", "<action>", "</action>", "<answer>"})
+
+
+def _ast_call_to_dict(act_str: str) -> dict[str, Any]:
+    """
+    Parse a `do(...)` / `finish(...)` call string into an action dict.
+
+    Uses `ast.parse` instead of `eval()`, so no bytecode is compiled or
+    executed per response line and arbitrary code in model output is rejected.
+    """
+    node = ast.parse(act_str, mode="eval").body
+    if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Name):
+        raise ValueError(f"Not a do()/finish() call: {act_str}")
+
+    func_name = node.func.id
+    if func_name not in ("do", "finish"):
+        raise ValueError(f"Unsupported call: {func_name}")
+
+    action = {kw.arg: ast.literal_eval(kw.value) for kw in node.keywords if kw.arg}
+    action["_sensitive"] = "message" in action
+    action["_metadata"] = func_name
+    return action
+
+
+@dataclass(slots=True, frozen=True)
 class ActionResult:
     """Result of an action execution."""
 
@@ -38,17 +97,43 @@ class ActionHandler:
         confirmation_callback: Optional callback for sensitive action confirmation.
             Should return True to proceed, False to cancel.
         takeover_callback: Optional callback for takeover requests (login, captcha).
+        persistent_shell: Route tap/swipe/key actions through one long-lived
+            `adb shell` process instead of spawning a subprocess per action.
     """
 
+    # Action name -> handler method name, built once at class creation so
+    # execute() does not rebuild a dict of bound methods on every call.
+    _HANDLERS: dict[str, str] = {
+        "Launch": "_handle_launch",
+        "Tap": "_handle_tap",
+        "Type": "_handle_type",
+        "Type_Name": "_handle_type",
+        "Swipe": "_handle_swipe",
+        "Back": "_handle_back",
+        "Home": "_handle_home",
+        "Double Tap": "_handle_double_tap",
+        "Long Press": "_handle_long_press",
+        "Wait": "_handle_wait",
+        "Take_over": "_handle_takeover",
+        "Note": "_handle_note",
+        "Call_API": "_handle_call_api",
+        "Interact": "_handle_interact",
+    }
+
     def __init__(
         self,
         device_id: str | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        persistent_shell: bool = False,
     ):
         self.device_id = device_id
         self.confirmation_callback = confirmation_callback or self._default_confirmation
         self.takeover_callback = takeover_callback or self._default_takeover
+        # 可选的常驻 adb shell 会话，省掉每个动作一次 fork+exec
+        self._shell: AdbShellSession | None = (
+            AdbShellSession(device_id) if persistent_shell else None
+        )
 
     def execute(
         self, action: dict[str, Any], screen_width: int, screen_height: int
@@ -97,54 +182,44 @@ class ActionHandler:
 
     def _get_handler(self, action_name: str) -> Callable | None:
         """Get the handler method for an action."""
-        handlers = {
-            "Launch": self._handle_launch,
-            "Tap": self._handle_tap,
-            "Type": self._handle_type,
-            "Type_Name": self._handle_type,
-            "Swipe": self._handle_swipe,
-            "Back": self._handle_back,
-            "Home": self._handle_home,
-            "Double Tap": self._handle_double_tap,
-            "Long Press": self._handle_long_press,
-            "Wait": self._handle_wait,
-            "Take_over": self._handle_takeover,
-            "Note": self._handle_note,
-            "Call_API": self._handle_call_api,
-            "Interact": self._handle_interact,
-        }
-        return handlers.get(action_name)
+        name = self._HANDLERS.get(action_name)
+        return getattr(self, name) if name else None
 
     def _convert_relative_to_absolute(
         self, element: list[int] | str, screen_width: int, screen_height: int
     ) -> tuple[int, int]:
         """Convert relative coordinates (0-1000) to absolute pixels."""
-        if isinstance(element, str):
+        # 常见情况是已经解析好的 list，先用 C 级的类型判断跳过字符串分支
+        if type(element) is not list and isinstance(element, str):
+            # 快速路径: 形如 "[285, 82]" 的字符串直接去括号切分取整，
+            # 在这么小的输入上比 json.loads 快一个数量级
             try:
-                import json
-                # 处理可能的字符串格式，如 "[285, 82]"
-                element = json.loads(element)
-            except:
-                # 尝试简单的去除括号
+                parts = element.strip().strip("[]() ").split(",")
+                element = [int(float(p)) for p in parts]
+            except ValueError:
                 try:
-                    cleaned = element.replace("[", "").replace("]", "")
-                    parts = cleaned.split(",")
-                    element = [int(p.strip()) for p in parts]
-                except:
+                    element = _json_loads(element)
+                except Exception:
                     raise ValueError(f"Invalid element format: {element}")
 
         if not isinstance(element, (list, tuple)) or len(element) < 2:
              raise ValueError(f"Element must be a list of 2 integers, got {element}")
         
-        # 确保坐标是数字
+        # 纯整数路径: 模型坐标是 0-1000 的整数，(rel * px) // 1000 全程走
+        # 小整数运算，不装箱任何浮点数，也没有舍入漂移
         try:
-            x_rel = float(element[0])
-            y_rel = float(element[1])
+            x_rel = int(element[0])
+            y_rel = int(element[1])
         except (ValueError, TypeError):
-             raise ValueError(f"Element coordinates must be numbers, got {element}")
+            # 极少数情况（如 "285.5" 字符串）退回经由 float 的转换
+            try:
+                x_rel = int(float(element[0]))
+                y_rel = int(float(element[1]))
+            except (ValueError, TypeError):
+                raise ValueError(f"Element coordinates must be numbers, got {element}")
 
-        x = int(x_rel / 1000 * screen_width)
-        y = int(y_rel / 1000 * screen_height)
+        x = (x_rel * screen_width) // 1000
+        y = (y_rel * screen_height) // 1000
         return x, y
 
     def _handle_launch(self, action: dict, width: int, height: int) -> ActionResult:
@@ -171,10 +246,12 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        print(f"[DEBUG] Tap action: relative={element}, absolute=({x}, {y})")
+        # %-style args: formatting only happens when a DEBUG handler is active
+        log.debug("Tap action: relative=%s absolute=(%s, %s)", element, x, y)
 
-        # Check for sensitive operation
-        if "message" in action:
+        # Check for sensitive operation (flag precomputed at parse time;
+        # fall back to the membership test for hand-built action dicts)
+        if action.get("_sensitive", "message" in action):
             if not self.confirmation_callback(action["message"]):
                 return ActionResult(
                     success=False,
@@ -182,40 +259,45 @@ class ActionHandler:
                     message="User cancelled sensitive operation",
                 )
 
-        tap(x, y, self.device_id)
-        
         # 容错处理：对于可能的边缘点击，尝试在周围小范围内补充点击
         # 很多时候模型给出的坐标可能正好在控件边缘，或者因为分辨率映射导致偏差
         # 尤其是顶部搜索框，很容易点偏
         if y < height * 0.15: # 针对顶部区域（通常是搜索框/导航栏）加强容错
-            print(f"[DEBUG] 启用顶部区域容错点击策略...")
+            log.debug("启用顶部区域容错点击策略...")
             offset = 20 # 像素偏移量
-            # 向下偏移一点（通常顶部控件容易偏上）
-            tap(x, y + offset, self.device_id, delay=0.1)
-            # 左右微调
-            tap(x + offset, y, self.device_id, delay=0.1)
-            tap(x - offset, y, self.device_id, delay=0.1)
-        
+            # 主点击 + 向下/左右微调，合并为一次 adb shell 调用
+            points = [(x, y), (x, y + offset), (x + offset, y), (x - offset, y)]
+            if self._shell:
+                self._shell.multi_tap(points)
+            else:
+                multi_tap(points, self.device_id)
+        elif self._shell:
+            self._shell.tap(x, y)
+        else:
+            tap(x, y, self.device_id)
+
         return ActionResult(True, False)
 
     def _handle_type(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle text input action."""
         text = action.get("text", "")
 
-        # Switch to ADB keyboard
+        # Switch to ADB keyboard and poll until it is active instead of
+        # sleeping a fixed second per step
         original_ime = detect_and_set_adb_keyboard(self.device_id)
-        time.sleep(1.0)
+        wait_for_ime("com.android.adbkeyboard/.AdbIME", self.device_id)
 
-        # Clear existing text and type new text
+        # Clear existing text and type new text; the broadcasts have no
+        # observable completion signal, so keep a small settling delay
         clear_text(self.device_id)
-        time.sleep(1.0)
+        time.sleep(0.2)
 
         type_text(text, self.device_id)
-        time.sleep(1.0)
+        time.sleep(0.2)
 
         # Restore original keyboard
         restore_keyboard(original_ime, self.device_id)
-        time.sleep(1.0)
+        wait_for_ime(original_ime, self.device_id)
 
         return ActionResult(True, False)
 
@@ -230,17 +312,26 @@ class ActionHandler:
         start_x, start_y = self._convert_relative_to_absolute(start, width, height)
         end_x, end_y = self._convert_relative_to_absolute(end, width, height)
 
-        swipe(start_x, start_y, end_x, end_y, device_id=self.device_id)
+        if self._shell:
+            self._shell.swipe(start_x, start_y, end_x, end_y)
+        else:
+            swipe(start_x, start_y, end_x, end_y, device_id=self.device_id)
         return ActionResult(True, False)
 
     def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle back button action."""
-        back(self.device_id)
+        if self._shell:
+            self._shell.back()
+        else:
+            back(self.device_id)
         return ActionResult(True, False)
 
     def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle home button action."""
-        home(self.device_id)
+        if self._shell:
+            self._shell.home()
+        else:
+            home(self.device_id)
         return ActionResult(True, False)
 
     def _handle_double_tap(self, action: dict, width: int, height: int) -> ActionResult:
@@ -250,7 +341,10 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        double_tap(x, y, self.device_id)
+        if self._shell:
+            self._shell.double_tap(x, y)
+        else:
+            double_tap(x, y, self.device_id)
         return ActionResult(True, False)
 
     def _handle_long_press(self, action: dict, width: int, height: int) -> ActionResult:
@@ -260,7 +354,10 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        long_press(x, y, device_id=self.device_id)
+        if self._shell:
+            self._shell.long_press(x, y)
+        else:
+            long_press(x, y, device_id=self.device_id)
         return ActionResult(True, False)
 
     def _handle_wait(self, action: dict, width: int, height: int) -> ActionResult:
@@ -309,6 +406,77 @@ class ActionHandler:
         input(f"{message}\nPress Enter after completing manual operation...")
 
 
+def _try_parse(act_str: str) -> dict[str, Any] | None:
+    """
+    尝试用五种策略解析单条动作字符串。
+
+    未命中时返回 None 而不是抛异常，避免在多行响应的解析循环里
+    反复支付异常构造/回溯的开销。
+
+    Args:
+        act_str: A single candidate action line.
+
+    Returns:
+        Parsed action dictionary, or None if no strategy matched.
+    """
+    act_str = act_str.strip()
+
+    # Method 1: parse do(...) or finish(...) call syntax
+    if act_str.startswith("do(") or act_str.startswith("finish("):
+        try:
+            return _ast_call_to_dict(act_str)
+        except (ValueError, SyntaxError):
+            pass
+
+    # Method 2: regex for do(...) / finish(...) embedded in other text
+    m = _DO_RE.search(act_str) or _FINISH_RE.search(act_str)
+    if m:
+        try:
+            return _ast_call_to_dict(m.group(1))
+        except (ValueError, SyntaxError):
+            pass
+
+    # Method 3: finish(message=...)
+    if act_str.startswith("finish"):
+        return {
+            "_metadata": "finish",
+            "message": act_str.replace("finish(message=", "").strip()[1:-2],
+            "_sensitive": True,
+        }
+
+    # Method 4: JSON-like dict with unquoted keys/values
+    if "{" in act_str and "}" in act_str:
+        dict_match = _DICT_RE.search(act_str)
+        if dict_match:
+            dict_str = dict_match.group(0)
+            dict_str = _KV_LIST_RE.sub(r'"\1": \2', dict_str)
+            dict_str = _KV_STR_RE.sub(r'"\1": "\2"', dict_str)
+            dict_str = _KV_BARE_RE.sub(r'"\1": "\2"', dict_str)
+            try:
+                action = _json_loads(dict_str)
+            except ValueError:
+                action = None
+            if isinstance(action, dict):
+                if "_metadata" not in action:
+                    action["_metadata"] = "do" if "action" in action else "finish"
+                action.setdefault("_sensitive", "message" in action)
+                return action
+
+    # Method 5: pure JSON (cheap first-char check before decoding)
+    if act_str[:1] == "{":
+        try:
+            action = _json_loads(act_str)
+        except ValueError:
+            return None
+        if isinstance(action, dict):
+            if "_metadata" not in action:
+                action["_metadata"] = "do"
+            action.setdefault("_sensitive", "message" in action)
+            return action
+
+    return None
+
+
 def parse_action(response: str) -> dict[str, Any] | list[dict[str, Any]]:
     """
     Parse action from model response.
@@ -322,104 +490,52 @@ def parse_action(response: str) -> dict[str, Any] | list[dict[str, Any]]:
     Raises:
         ValueError: If the response cannot be parsed.
     """
-    import json
-    import re
-    
     try:
-        response = response.strip()
-        # Clean up tags
-        response = response.replace("<|begin_of_box|>", "").replace("<|end_of_box|>", "")
-        response = response.replace("{think}", "").replace("{action}", "")
-        response = response.replace("</s>", "")
-        response = response.replace("<think>", "").replace("</think>", "")
-        response = response.replace("<answer>", "").replace("</answer>", "")
-        response = response.replace("answer>", "")
-        response = response.replace("<tool_call>", "")
-        
-        # 预处理: 处理多行响应，提取有效的动作行
-        lines = response.split('\n')
+        # Clean up tags in a single pass
+        response = _TAG_SUB_RE.sub("", response).strip()
+
+        # 快速路径: 绝大多数响应是单行的 do(...)/finish(...)，直接解析并返回，
+        # 跳过下面的多行扫描和回退策略
+        if _SIMPLE_CALL_RE.match(response):
+            try:
+                return _ast_call_to_dict(response)
+            except (ValueError, SyntaxError):
+                pass
+
+        # 预处理: 处理多行响应，单次遍历提取有效行和动作行
         valid_lines = []
         action_lines = []  # 专门收集动作行
-        
-        for line in lines:
+
+        for line in response.split('\n'):
             line = line.strip()
             # 跳过空行和明显的模板占位符
-            if not line or line in ['{action}', '{think}', '<action>', '</action>', '<answer>']:
+            if not line or line in _PLACEHOLDERS:
                 continue
-            
-            # 收集所有可能的动作行
-            if (line.startswith('do(') or line.startswith('finish(') or 
-                line.startswith('{action=') or line.startswith('{"action"')):
+
+            # 收集所有可能的动作行（先比较首字符，省掉多数行的 startswith 链）
+            head = line[0]
+            if (
+                (head == 'd' and line.startswith('do('))
+                or (head == 'f' and line.startswith('finish('))
+                or (head == '{' and (line.startswith('{action=') or line.startswith('{"action"')))
+            ):
                 action_lines.append(line)
-            
+
             valid_lines.append(line)
         
-        # Helper function to parse a single action string
-        def parse_single_action(act_str: str) -> dict[str, Any]:
-            act_str = act_str.strip()
-            # Method 1: eval do(...) or finish(...)
-            if act_str.startswith("do(") or act_str.startswith("finish("):
-                return eval(act_str)
-            
-            # Method 2: Regex for do(...)
-            m = re.search(r'(do\([^\n\r]*\))', act_str)
-            if not m:
-                m = re.search(r'(finish\([^\n\r]*\))', act_str)
-            if m:
-                return eval(m.group(1))
-            
-            # Method 3: finish(message=...)
-            if act_str.startswith("finish"):
-                return {
-                    "_metadata": "finish",
-                    "message": act_str.replace("finish(message=", "").strip()[1:-2],
-                }
-            
-            # Method 4: JSON-like
-            if "{" in act_str and "}" in act_str:
-                dict_match = re.search(r'\{[^}]+\}', act_str)
-                if dict_match:
-                    dict_str = dict_match.group(0)
-                    dict_str = re.sub(r'(\w+)=(\[[^\]]+\])', r'"\1": \2', dict_str)
-                    dict_str = re.sub(r'(\w+)="([^"]+)"', r'"\1": "\2"', dict_str)
-                    dict_str = re.sub(r'(\w+)=([^,}\s\[]+)', r'"\1": "\2"', dict_str)
-                    action = json.loads(dict_str)
-                    if "_metadata" not in action:
-                        if "action" in action:
-                            action["_metadata"] = "do"
-                        else:
-                            action["_metadata"] = "finish"
-                    return action
-            
-            # Method 5: Pure JSON
-            action = json.loads(act_str)
-            if "_metadata" not in action:
-                action["_metadata"] = "do"
-            return action
-
         # Parse all identified action lines
         parsed_actions = []
         if action_lines:
             for line in action_lines:
-                try:
-                    parsed_actions.append(parse_single_action(line))
-                except:
-                    pass
+                parsed = _try_parse(line)
+                if parsed is not None:
+                    parsed_actions.append(parsed)
         elif valid_lines:
-            # Fallback to checking valid lines if no explicit action lines found
-            for line in valid_lines:
-                if line.startswith('do(') or line.startswith('finish('):
-                    try:
-                        parsed_actions.append(parse_single_action(line))
-                    except:
-                        pass
-            
-            # If still empty, try parsing the first valid line
-            if not parsed_actions and valid_lines:
-                try:
-                    parsed_actions.append(parse_single_action(valid_lines[0]))
-                except:
-                    pass
+            # 没有显式动作行时（上面的单次遍历已经确认没有 do(/finish( 行），
+            # 回退为解析第一条有效行
+            parsed = _try_parse(valid_lines[0])
+            if parsed is not None:
+                parsed_actions.append(parsed)
 
         # Return logic
         if not parsed_actions:
@@ -427,9 +543,9 @@ def parse_action(response: str) -> dict[str, Any] | list[dict[str, Any]]:
             lower = response.lower()
             if ("wait" in lower or "等待" in response or "加载" in response or "loading" in lower or "刷新" in response):
                 try:
-                    dur_match = re.search(r"(\d+)\s*秒", response)
+                    dur_match = _DURATION_CN_RE.search(response)
                     if not dur_match:
-                         dur_match = re.search(r"(\d+)\s*seconds?", response, re.IGNORECASE)
+                         dur_match = _DURATION_EN_RE.search(response)
                     
                     duration = f"{dur_match.group(1)} seconds" if dur_match else "2 seconds"
                     return {
@@ -455,11 +571,13 @@ def parse_action(response: str) -> dict[str, Any] | list[dict[str, Any]]:
 
 def do(**kwargs) -> dict[str, Any]:
     """Helper function for creating 'do' actions."""
+    kwargs["_sensitive"] = "message" in kwargs
     kwargs["_metadata"] = "do"
     return kwargs
 
 
 def finish(**kwargs) -> dict[str, Any]:
     """Helper function for creating 'finish' actions."""
+    kwargs["_sensitive"] = "message" in kwargs
     kwargs["_metadata"] = "finish"
     return kwargs
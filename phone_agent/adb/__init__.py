@@ -14,6 +14,7 @@ from phone_agent.adb.device import (
     home,
     launch_app,
     long_press,
+    multi_tap,
     swipe,
     tap,
 )
@@ -22,8 +23,10 @@ from phone_agent.adb.input import (
     detect_and_set_adb_keyboard,
     restore_keyboard,
     type_text,
+    wait_for_ime,
 )
 from phone_agent.adb.screenshot import get_screenshot
+from phone_agent.adb.shell import AdbShellSession
 
 __all__ = [
     # Screenshot
@@ -33,15 +36,19 @@ __all__ = [
     "clear_text",
     "detect_and_set_adb_keyboard",
     "restore_keyboard",
+    "wait_for_ime",
     # Device control
     "get_current_app",
     "tap",
+    "multi_tap",
     "swipe",
     "back",
     "home",
     "double_tap",
     "long_press",
     "launch_app",
+    # Persistent shell
+    "AdbShellSession",
     # Connection management
     "ADBConnection",
     "DeviceInfo",
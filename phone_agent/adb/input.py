@@ -2,6 +2,7 @@
 
 import base64
 import subprocess
+import time
 from typing import Optional
 
 
@@ -87,6 +88,45 @@ def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
     return current_ime
 
 
+def wait_for_ime(
+    expected: str,
+    device_id: str | None = None,
+    timeout: float = 1.0,
+    tick: float = 0.05,
+) -> bool:
+    """
+    Poll until the device's default IME matches the expected one.
+
+    Replaces fixed sleeps after keyboard switches: the common case returns
+    in one or two ticks instead of waiting out a full second.
+
+    Args:
+        expected: IME identifier (or substring) to wait for.
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Maximum time to wait in seconds.
+        tick: Polling interval in seconds.
+
+    Returns:
+        True if the IME matched within the timeout, False otherwise.
+    """
+    adb_prefix = _get_adb_prefix(device_id)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        result = subprocess.run(
+            adb_prefix
+            + ["shell", "settings", "get", "secure", "default_input_method"],
+            capture_output=True,
+            text=True,
+        )
+        current = (result.stdout + result.stderr).strip()
+        if expected and expected in current:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(tick)
+
+
 def restore_keyboard(ime: str, device_id: str | None = None) -> None:
     """
     Restore the original keyboard IME.
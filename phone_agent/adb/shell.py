@@ -0,0 +1,136 @@
+"""Persistent adb shell session for low-latency device input."""
+
+import subprocess
+import threading
+import time
+
+
+class AdbShellSession:
+    """
+    Long-lived ``adb shell`` process that runs input commands via stdin.
+
+    Every ``adb shell input ...`` normally spawns a new subprocess and pays
+    fork+exec plus the ADB/USB handshake (~40-80 ms). Writing command lines
+    to one persistent shell reduces each action to the on-device cost of
+    the command itself. The shell is started lazily and restarted if it
+    dies (e.g. on device disconnect).
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+    """
+
+    _SENTINEL = "__DONE__"
+
+    def __init__(self, device_id: str | None = None):
+        self.device_id = device_id
+        self._process: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    def send(self, command: str) -> None:
+        """
+        Run a shell command on the device and wait for completion.
+
+        Args:
+            command: Shell command line (without the `adb shell` prefix).
+        """
+        with self._lock:
+            process = self._ensure_process()
+            process.stdin.write(f"{command}; echo {self._SENTINEL}\n")
+            process.stdin.flush()
+            for line in process.stdout:
+                if self._SENTINEL in line:
+                    break
+
+    def close(self) -> None:
+        """Terminate the underlying shell process."""
+        with self._lock:
+            if self._process is not None:
+                try:
+                    self._process.stdin.close()
+                    self._process.terminate()
+                except OSError:
+                    pass
+                self._process = None
+
+    def tap(self, x: int, y: int, delay: float = 1.0) -> None:
+        """Tap at the given coordinates (short swipe, as in device.tap)."""
+        self.send(f"input swipe {x} {y} {x} {y} 100")
+        time.sleep(delay)
+
+    def multi_tap(
+        self,
+        points: list[tuple[int, int]],
+        inter_delay: float = 0.1,
+        delay: float = 1.0,
+    ) -> None:
+        """Tap a sequence of coordinates in one round trip."""
+        if not points:
+            return
+        commands = [f"input swipe {x} {y} {x} {y} 100" for x, y in points]
+        self.send(f"; sleep {inter_delay}; ".join(commands))
+        time.sleep(delay)
+
+    def double_tap(self, x: int, y: int, delay: float = 1.0) -> None:
+        """Double tap at the given coordinates."""
+        self.send(f"input tap {x} {y}; sleep 0.1; input tap {x} {y}")
+        time.sleep(delay)
+
+    def long_press(
+        self, x: int, y: int, duration_ms: int = 3000, delay: float = 1.0
+    ) -> None:
+        """Long press at the given coordinates."""
+        self.send(f"input swipe {x} {y} {x} {y} {duration_ms}")
+        time.sleep(delay)
+
+    def swipe(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration_ms: int | None = None,
+        delay: float = 1.0,
+    ) -> None:
+        """Swipe from start to end coordinates (same duration logic as device.swipe)."""
+        if duration_ms is None:
+            dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
+            duration_ms = int(dist_sq / 1000)
+            duration_ms = max(1000, min(duration_ms, 2000))
+
+        self.send(
+            f"input swipe {start_x} {start_y} {end_x} {end_y} {duration_ms}"
+        )
+        time.sleep(delay)
+
+    def back(self, delay: float = 1.0) -> None:
+        """Press the back button."""
+        self.send("input keyevent 4")
+        time.sleep(delay)
+
+    def home(self, delay: float = 1.0) -> None:
+        """Press the home button."""
+        self.send("input keyevent KEYCODE_HOME")
+        time.sleep(delay)
+
+    def _ensure_process(self) -> subprocess.Popen:
+        """Start (or restart) the shell process if needed."""
+        if self._process is None or self._process.poll() is not None:
+            cmd = ["adb"]
+            if self.device_id:
+                cmd += ["-s", self.device_id]
+            cmd.append("shell")
+            self._process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+            )
+        return self._process
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -2,6 +2,7 @@
 
 import json
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable
 
@@ -91,6 +92,10 @@ class PhoneAgent:
 
         self._context: list[dict[str, Any]] = []
         self._step_count = 0
+        # 用于并行执行相互独立的 ADB 调用（截图 + 前台应用查询）
+        self._adb_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="adb-capture"
+        )
 
     def run(self, task: str) -> str:
         """
@@ -150,9 +155,14 @@ class PhoneAgent:
         """Execute a single step of the agent loop."""
         self._step_count += 1
 
-        # Capture current screen state
+        # Capture current screen state. The screenshot (adb screencap + pull)
+        # and the focused-app query are independent ADB round trips, so run
+        # them concurrently instead of back to back.
+        app_future = self._adb_executor.submit(
+            get_current_app, self.agent_config.device_id
+        )
         screenshot = get_screenshot(self.agent_config.device_id)
-        current_app = get_current_app(self.agent_config.device_id)
+        current_app = app_future.result()
 
         # Build messages
         if is_first:
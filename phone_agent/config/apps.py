@@ -1,6 +1,9 @@
 """App name to package name mapping for supported applications."""
 
-APP_PACKAGES: dict[str, str] = {
+from collections.abc import Mapping
+from types import MappingProxyType
+
+APP_PACKAGES: Mapping[str, str] = MappingProxyType({
     # Social & Messaging
     "微信": "com.tencent.mm",
     "QQ": "com.tencent.mobileqq",
@@ -185,7 +188,14 @@ APP_PACKAGES: dict[str, str] = {
     "wechat": "com.tencent.mm",
     "Whatsapp": "com.whatsapp",
     "WhatsApp": "com.whatsapp",
-}
+})
+
+
+# 大小写/空白归一化后的查找表，导入时构建一次，
+# 查找时就不必对表里的每个键重复做 lower()/strip()
+_NORMALIZED_PACKAGES: Mapping[str, str] = MappingProxyType(
+    {name.strip().lower(): package for name, package in APP_PACKAGES.items()}
+)
 
 
 def get_package_name(app_name: str) -> str | None:
@@ -198,7 +208,10 @@ def get_package_name(app_name: str) -> str | None:
     Returns:
         The Android package name, or None if not found.
     """
-    return APP_PACKAGES.get(app_name)
+    package = APP_PACKAGES.get(app_name)
+    if package is None:
+        package = _NORMALIZED_PACKAGES.get(app_name.strip().lower())
+    return package
 
 
 def get_app_name(package_name: str) -> str | None:
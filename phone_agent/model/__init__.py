@@ -9,50 +9,56 @@
     # 方式 1: 使用工厂函数（推荐）
     from phone_agent.model import create_api_client
     client = create_api_client(provider="zhipu", api_key="your-key")
-    
+
     # 方式 2: 使用配置类
     from phone_agent.model import ZhipuAPIConfig, ZhipuAPIClient
     config = ZhipuAPIConfig(api_key="your-key")
     client = ZhipuAPIClient(config)
-    
+
     # 方式 3: 旧接口（向后兼容）
     from phone_agent.model import ModelClient, ModelConfig
     config = ModelConfig(provider="zhipu", api_key="your-key")
     client = ModelClient(config)
 """
 
-# 向后兼容的接口
-from phone_agent.model.client import ModelClient, ModelConfig
-
-# 新的 API 架构
-from phone_agent.model.base import (
-    APIProvider,
-    BaseAPIClient,
-    BaseAPIConfig,
-    ModelResponse,
-)
-from phone_agent.model.local_client import LocalAPIClient, LocalAPIConfig
-from phone_agent.model.zhipu_client import ZhipuAPIClient, ZhipuAPIConfig
-from phone_agent.model.factory import (
-    APIClientFactory,
-    ConfigManager,
-    create_api_client,
-)
-
-__all__ = [
-    # 向后兼容
-    "ModelClient",
-    "ModelConfig",
-    # 新 API
-    "APIProvider",
-    "BaseAPIClient",
-    "BaseAPIConfig",
-    "ModelResponse",
-    "LocalAPIClient",
-    "LocalAPIConfig",
-    "ZhipuAPIClient",
-    "ZhipuAPIConfig",
-    "APIClientFactory",
-    "ConfigManager",
-    "create_api_client",
-]
+import importlib
+
+# 懒加载映射: 名称 -> (模块, 属性)。
+# 子模块会拉起 openai/httpx 等较重的依赖，按需导入可以显著缩短
+# `import phone_agent.model` 的冷启动时间 (PEP 562)。
+_LAZY: dict[str, tuple[str, str]] = {
+    # 向后兼容的接口
+    "ModelClient": ("phone_agent.model.client", "ModelClient"),
+    "ModelConfig": ("phone_agent.model.client", "ModelConfig"),
+    # 新的 API 架构
+    "APIProvider": ("phone_agent.model.base", "APIProvider"),
+    "BaseAPIClient": ("phone_agent.model.base", "BaseAPIClient"),
+    "BaseAPIConfig": ("phone_agent.model.base", "BaseAPIConfig"),
+    "ModelResponse": ("phone_agent.model.base", "ModelResponse"),
+    "LocalAPIClient": ("phone_agent.model.local_client", "LocalAPIClient"),
+    "LocalAPIConfig": ("phone_agent.model.local_client", "LocalAPIConfig"),
+    "ZhipuAPIClient": ("phone_agent.model.zhipu_client", "ZhipuAPIClient"),
+    "ZhipuAPIConfig": ("phone_agent.model.zhipu_client", "ZhipuAPIConfig"),
+    "APIClientFactory": ("phone_agent.model.factory", "APIClientFactory"),
+    "ConfigManager": ("phone_agent.model.factory", "ConfigManager"),
+    "create_api_client": ("phone_agent.model.factory", "create_api_client"),
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    """按需解析并缓存懒加载的属性 (PEP 562)。"""
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        ) from None
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value  # 缓存，后续访问不再走 __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
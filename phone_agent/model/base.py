@@ -1,9 +1,24 @@
 """基础 API 客户端抽象类和通用数据结构。"""
 
+import asyncio
+import atexit
+import hashlib
+import json
+import re
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, ClassVar
+
+import httpx
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+# 响应缓存的最大条目数（LRU 淘汰）
+_RESPONSE_CACHE_SIZE = 64
 
 
 class APIProvider(Enum):
@@ -26,7 +41,7 @@ class ModelResponse:
     model_name: str  # 使用的模型名称
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseAPIConfig:
     """API 配置的基础类。"""
 
@@ -40,6 +55,7 @@ class BaseAPIConfig:
     frequency_penalty: float = 0.2
     timeout: int = 120  # 超时时间（秒）
     max_retries: int = 3  # 最大重试次数
+    enable_cache: bool = False  # 对相同消息复用缓存的响应（重试/调试循环时有用）
 
     def to_dict(self) -> dict[str, Any]:
         """转换为字典格式。"""
@@ -54,9 +70,53 @@ class BaseAPIConfig:
             "frequency_penalty": self.frequency_penalty,
             "timeout": self.timeout,
             "max_retries": self.max_retries,
+            "enable_cache": self.enable_cache,
         }
 
 
+@lru_cache(maxsize=8)
+def _get_openai_client(
+    base_url: str, api_key: str, timeout: int, max_retries: int
+) -> "OpenAI":
+    """
+    按 (base_url, api_key, timeout, max_retries) 复用 OpenAI 客户端。
+
+    每个 OpenAI(...) 实例自带一个 httpx 连接池，重复构造意味着每个新
+    ModelClient 首次请求都要重新付出 TCP+TLS 握手。这里缓存客户端并
+    挂到共享的 httpx 连接池上，套接字在实例之间保持热连接；共享池由
+    atexit 统一关闭。
+    """
+    from openai import OpenAI
+
+    return OpenAI(
+        base_url=base_url,
+        api_key=api_key,
+        timeout=timeout,
+        max_retries=max_retries,
+        http_client=BaseAPIClient._get_http_client(),
+    )
+
+
+@lru_cache(maxsize=8)
+def _get_async_openai_client(
+    base_url: str, api_key: str, timeout: int, max_retries: int
+) -> "AsyncOpenAI":
+    """
+    按连接参数复用 AsyncOpenAI 客户端（异步连接池）。
+
+    与 _get_openai_client 对应的异步版本，首次调用 arequest 时才构造，
+    并发跑多条 agent 轨迹时共享同一个 httpx.AsyncClient 连接池。
+    """
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        base_url=base_url,
+        api_key=api_key,
+        timeout=timeout,
+        max_retries=max_retries,
+    )
+
+
 class BaseAPIClient(ABC):
     """
     API 客户端的抽象基类。
@@ -64,14 +124,57 @@ class BaseAPIClient(ABC):
     所有 API 提供商的客户端都应该继承这个类并实现相应的方法。
     """
 
+    # 所有客户端实例共享的 httpx 连接池，懒加载。
+    # 复用 TCP/TLS 连接，避免每个客户端实例首次请求都付出完整握手开销。
+    _shared_http_client: ClassVar[httpx.Client | None] = None
+
+    # <think>...</think><answer>...</answer> 信封，类定义时编译一次
+    _THINK_ANSWER_RE: ClassVar[re.Pattern[str]] = re.compile(
+        r"<think>(.*?)</think>\s*<answer>(.*?)</answer>", re.DOTALL
+    )
+
     def __init__(self, config: BaseAPIConfig):
         """
         初始化 API 客户端。
-        
+
         Args:
             config: API 配置对象
         """
         self.config = config
+        # 相同消息 -> 响应 的 LRU 缓存，仅在 config.enable_cache 时使用
+        self._response_cache: OrderedDict[str, ModelResponse] = OrderedDict()
+
+    def _cache_key(self, messages: list[dict[str, Any]]) -> str:
+        """计算消息列表的稳定缓存键。"""
+        payload = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str) -> "ModelResponse | None":
+        """查询响应缓存，命中时刷新 LRU 顺序。"""
+        response = self._response_cache.get(key)
+        if response is not None:
+            self._response_cache.move_to_end(key)
+        return response
+
+    def _cache_put(self, key: str, response: "ModelResponse") -> None:
+        """写入响应缓存，超出容量时淘汰最旧条目。"""
+        cache = self._response_cache
+        cache[key] = response
+        if len(cache) > _RESPONSE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    @classmethod
+    def _get_http_client(cls) -> httpx.Client:
+        """获取共享的 httpx 客户端（连接池 + keepalive）。"""
+        if BaseAPIClient._shared_http_client is None:
+            client = httpx.Client(
+                limits=httpx.Limits(
+                    max_keepalive_connections=10, max_connections=20
+                ),
+            )
+            BaseAPIClient._shared_http_client = client
+            atexit.register(client.close)
+        return BaseAPIClient._shared_http_client
 
     @abstractmethod
     def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
@@ -90,11 +193,84 @@ class BaseAPIClient(ABC):
         """
         pass
 
+    @staticmethod
+    def _consume_stream(stream: Any) -> str:
+        """
+        消费流式响应，出现 </answer> 就停止并关闭流。
+
+        跨增量的结束标签用上一增量的尾部窗口拼接检测，整体 O(N)，
+        不做重复的全量 join 扫描。
+        """
+        pieces: list[str] = []
+        tail = ""
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content or ""
+                if not piece:
+                    continue
+                pieces.append(piece)
+                window = tail + piece
+                if "</answer>" in window:
+                    break
+                tail = window[-8:]  # len("</answer>") - 1
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return "".join(pieces)
+
+    async def arequest(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        异步发送请求到 API 并返回响应。
+
+        默认未实现；支持异步的客户端应覆盖此方法。配合 asyncio.gather
+        可以在一个进程内并发跑多条 agent 轨迹。
+
+        Args:
+            messages: OpenAI 格式的消息列表
+
+        Returns:
+            ModelResponse: 统一的模型响应对象
+        """
+        raise NotImplementedError(f"{type(self).__name__} 暂不支持异步请求")
+
+    def request_batch(
+        self, messages: list[dict[str, Any]], n: int = 1
+    ) -> list[ModelResponse]:
+        """
+        对同一条 prompt 取回 n 条补全（自一致性/重排序等评测场景）。
+
+        默认实现用 asyncio.gather 并发 n 次 arequest；支持单次请求携带
+        n= 参数的提供商可以覆盖此方法，把 K 次往返合并成 1 次。
+
+        Args:
+            messages: OpenAI 格式的消息列表
+            n: 需要的补全条数
+
+        Returns:
+            n 个 ModelResponse 的列表
+        """
+        if n <= 1:
+            return [self.request(messages)]
+
+        async def _gather() -> list[ModelResponse]:
+            return list(
+                await asyncio.gather(*(self.arequest(messages) for _ in range(n)))
+            )
+
+        return asyncio.run(_gather())
+
     @abstractmethod
-    def validate_config(self) -> bool:
+    def validate_config(self, probe: bool = False) -> bool:
         """
         验证配置是否有效。
-        
+
+        Args:
+            probe: 是否发送一次真实请求验证连通性。默认只做本地字段检查，
+                不产生网络往返。
+
         Returns:
             bool: 配置是否有效
         """
@@ -112,9 +288,15 @@ class BaseAPIClient(ABC):
         Returns:
             tuple[str, str]: (思考过程, 执行动作)
         """
+        # 无信封的响应直接返回，不进正则引擎
         if "<answer>" not in content:
             return "", content
 
+        m = self._THINK_ANSWER_RE.search(content)
+        if m:
+            return m.group(1).strip(), m.group(2).strip()
+
+        # 信封不完整（如缺 think 标签）时退回宽松的切分逻辑
         parts = content.split("<answer>", 1)
         thinking = parts[0].replace("<think>", "").replace("</think>", "").strip()
         action = parts[1].replace("</answer>", "").strip()
@@ -7,14 +7,36 @@
     client = create_api_client(provider="zhipu", api_key="your-key")
 """
 
+import hashlib
 import json
+import sys
 import warnings
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, Union
 
+try:
+    # 可选加速: orjson 序列化嵌套 dict 比标准库快数倍，默认就保留非 ASCII 字符
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+
+# 预 intern 的消息字段/角色字符串。长会话里这些键会被构造和比较
+# 数以万计次，intern 后 dict 查找和相等判断走指针比较的快路径
+_ROLE, _CONTENT, _TYPE, _TEXT, _IMAGE_URL, _URL = map(
+    sys.intern, ("role", "content", "type", "text", "image_url", "url")
+)
+_SYSTEM, _USER, _ASSISTANT = map(sys.intern, ("system", "user", "assistant"))
+
 from phone_agent.model.base import BaseAPIClient, BaseAPIConfig, ModelResponse as NewModelResponse
 from phone_agent.model.factory import APIClientFactory
-from phone_agent.model.local_client import LocalAPIConfig
 
 
 @dataclass
@@ -38,45 +60,31 @@ class ModelConfig:
         default_factory=lambda: {"skip_special_tokens": False}
     )
     provider: str = "local"  # 新增: 支持指定提供商
+    cache_size: int = 128  # 响应缓存条目数，0 表示禁用（仅 temperature == 0 时生效）
 
     def to_new_config(self) -> BaseAPIConfig:
         """转换为新的配置格式。"""
-        if self.provider == "local":
-            return LocalAPIConfig(
-                base_url=self.base_url,
-                api_key=self.api_key,
-                model_name=self.model_name,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                extra_body=self.extra_body,
-            )
-        elif self.provider == "zhipu":
+        # 公共字段只构造一次，按提供商 ** 展开到对应的配置类
+        common = dict(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            model_name=self.model_name,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            frequency_penalty=self.frequency_penalty,
+        )
+
+        if self.provider == "zhipu":
             # 智谱 AI 配置
             from phone_agent.model.zhipu_client import ZhipuAPIConfig
-            
-            return ZhipuAPIConfig(
-                base_url=self.base_url,
-                api_key=self.api_key,
-                model_name=self.model_name,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-            )
-        else:
-            # 其他提供商，默认使用本地配置
-            return LocalAPIConfig(
-                base_url=self.base_url,
-                api_key=self.api_key,
-                model_name=self.model_name,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                frequency_penalty=self.frequency_penalty,
-                extra_body=self.extra_body,
-            )
+
+            return ZhipuAPIConfig(**common)
+
+        # local 及其他提供商，默认使用本地配置
+        from phone_agent.model.local_client import LocalAPIConfig
+
+        return LocalAPIConfig(**common, extra_body=self.extra_body)
 
 
 @dataclass
@@ -140,6 +148,11 @@ class ModelClient:
                 f"请使用 ModelConfig 或 BaseAPIConfig 的子类（如 ZhipuAPIConfig, LocalAPIConfig）"
             )
 
+        # 相同消息 -> 响应 的 LRU 缓存。Agent 循环在无操作步骤后经常重发
+        # 几乎相同的上下文，命中时省掉一次数秒级的 LLM 调用。
+        self._cache_size: int = getattr(config, "cache_size", 128)
+        self._response_cache: OrderedDict[str, ModelResponse] = OrderedDict()
+
     def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
         """
         发送请求到模型。
@@ -153,16 +166,102 @@ class ModelClient:
         Raises:
             ValueError: 如果响应无法解析
         """
+        # 仅在确定性采样（temperature == 0）时启用缓存，
+        # 避免把随机输出固化成同一个答案
+        cache_key = None
+        if self._cache_size > 0 and getattr(self.config, "temperature", 1.0) == 0:
+            cache_key = self._cache_key(messages)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                return cached
+
         # 使用内部客户端发送请求
         new_response: NewModelResponse = self._internal_client.request(messages)
-        
+
         # 转换为旧的响应格式以保持兼容性
+        result = ModelResponse(
+            thinking=new_response.thinking,
+            action=new_response.action,
+            raw_content=new_response.raw_content,
+        )
+
+        if cache_key is not None:
+            self._response_cache[cache_key] = result
+            if len(self._response_cache) > self._cache_size:
+                self._response_cache.popitem(last=False)
+        return result
+
+    def stream_request(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        流式请求模型，解析到 </answer> 即返回，降低长输出的感知延迟。
+
+        Args:
+            messages: OpenAI 格式的消息列表
+
+        Returns:
+            ModelResponse: 包含 thinking 和 action 的响应
+        """
+        new_response: NewModelResponse = self._internal_client.stream_request(messages)
         return ModelResponse(
             thinking=new_response.thinking,
             action=new_response.action,
             raw_content=new_response.raw_content,
         )
 
+    async def arequest(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        异步发送请求到模型（配合 asyncio.gather 并发多条轨迹）。
+
+        Args:
+            messages: OpenAI 格式的消息列表
+
+        Returns:
+            ModelResponse: 包含 thinking 和 action 的响应
+
+        Raises:
+            NotImplementedError: 如果底层客户端不支持异步请求
+        """
+        new_response: NewModelResponse = await self._internal_client.arequest(messages)
+        return ModelResponse(
+            thinking=new_response.thinking,
+            action=new_response.action,
+            raw_content=new_response.raw_content,
+        )
+
+    def _cache_key(self, messages: list[dict[str, Any]]) -> str:
+        """
+        计算消息列表 + 采样参数的稳定缓存键。
+
+        图片只摘要 data URI 的前缀和长度，避免对整段 base64 做哈希。
+        """
+        compact: list[Any] = []
+        for msg in messages:
+            content = msg.get("content")
+            if isinstance(content, list):
+                items = []
+                for item in content:
+                    if item.get("type") == "image_url":
+                        url = item.get("image_url", {}).get("url", "")
+                        items.append(("image_url", url[:64], len(url)))
+                    else:
+                        items.append(("text", item.get("text", "")))
+                compact.append((msg.get("role"), tuple(items)))
+            else:
+                compact.append((msg.get("role"), content))
+
+        cfg = self.config
+        payload = repr(
+            (
+                compact,
+                getattr(cfg, "model_name", ""),
+                getattr(cfg, "temperature", 0.0),
+                getattr(cfg, "top_p", 0.0),
+                getattr(cfg, "max_tokens", 0),
+            )
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
     def _parse_response(self, content: str) -> tuple[str, str]:
         """
         解析模型响应为思考和动作两部分（向后兼容）。
@@ -182,7 +281,7 @@ class MessageBuilder:
     @staticmethod
     def create_system_message(content: str) -> dict[str, Any]:
         """Create a system message."""
-        return {"role": "system", "content": content}
+        return {_ROLE: _SYSTEM, _CONTENT: content}
 
     @staticmethod
     def create_user_message(
@@ -193,7 +292,9 @@ class MessageBuilder:
 
         Args:
             text: Text content.
-            image_base64: Optional base64-encoded image.
+            image_base64: Optional base64-encoded image, or a complete
+                ``data:`` URI. Callers resending the same screenshot should
+                encode once and reuse the string.
 
         Returns:
             Message dictionary.
@@ -201,21 +302,26 @@ class MessageBuilder:
         content = []
 
         if image_base64:
+            # 已经是 data URI 时直接使用，避免对 MB 级字符串再做一次拼接拷贝
+            if image_base64.startswith("data:"):
+                url = image_base64
+            else:
+                url = f"data:image/png;base64,{image_base64}"
             content.append(
                 {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
+                    _TYPE: _IMAGE_URL,
+                    _IMAGE_URL: {_URL: url},
                 }
             )
 
-        content.append({"type": "text", "text": text})
+        content.append({_TYPE: _TEXT, _TEXT: text})
 
-        return {"role": "user", "content": content}
+        return {_ROLE: _USER, _CONTENT: content}
 
     @staticmethod
     def create_assistant_message(content: str) -> dict[str, Any]:
         """Create an assistant message."""
-        return {"role": "assistant", "content": content}
+        return {_ROLE: _ASSISTANT, _CONTENT: content}
 
     @staticmethod
     def remove_images_from_message(message: dict[str, Any]) -> dict[str, Any]:
@@ -228,9 +334,13 @@ class MessageBuilder:
         Returns:
             Message with images removed.
         """
-        if isinstance(message.get("content"), list):
-            message["content"] = [
-                item for item in message["content"] if item.get("type") == "text"
+        content = message.get(_CONTENT)
+        # 历史裁剪时消息大多已经是纯文本，没有图片就不重建列表
+        if isinstance(content, list) and any(
+            item.get(_TYPE) == _IMAGE_URL for item in content
+        ):
+            message[_CONTENT] = [
+                item for item in content if item.get(_TYPE) == _TEXT
             ]
         return message
 
@@ -247,4 +357,4 @@ class MessageBuilder:
             JSON string with screen info.
         """
         info = {"current_app": current_app, **extra_info}
-        return json.dumps(info, ensure_ascii=False)
+        return _dumps(info)
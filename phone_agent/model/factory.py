@@ -1,11 +1,56 @@
 """API 客户端工厂和配置管理器。"""
 
+import importlib
 import os
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from phone_agent.model.base import APIProvider, BaseAPIClient, BaseAPIConfig
-from phone_agent.model.local_client import LocalAPIClient, LocalAPIConfig
-from phone_agent.model.zhipu_client import ZhipuAPIClient, ZhipuAPIConfig
+
+if TYPE_CHECKING:
+    from phone_agent.model.local_client import LocalAPIClient, LocalAPIConfig
+    from phone_agent.model.zhipu_client import ZhipuAPIClient, ZhipuAPIConfig
+
+# 懒加载映射: 提供商模块只在真正用到时才导入，
+# `import phone_agent.model.factory` 不再拉起全部提供商的依赖 (PEP 562)
+_LAZY: dict[str, tuple[str, str]] = {
+    "LocalAPIClient": ("phone_agent.model.local_client", "LocalAPIClient"),
+    "LocalAPIConfig": ("phone_agent.model.local_client", "LocalAPIConfig"),
+    "ZhipuAPIClient": ("phone_agent.model.zhipu_client", "ZhipuAPIClient"),
+    "ZhipuAPIConfig": ("phone_agent.model.zhipu_client", "ZhipuAPIConfig"),
+}
+
+
+def __getattr__(name: str):
+    """按需解析提供商类，供仍从 factory 导入它们的旧代码使用。"""
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value  # 缓存，后续访问不再走 __getattr__
+    return value
+
+
+# 配置类型 -> 客户端类 的分发表，由各提供商模块在导入时自注册填充。
+# 命中时 create_client 是一次 O(1) 的 dict 查找，新增提供商无需改工厂。
+_CLIENT_REGISTRY: dict[type, type] = {}
+
+
+def register_client(config_cls: type):
+    """
+    类装饰器: 把客户端类注册为对应配置类型的构造器。
+
+    使用示例:
+        @register_client(MyAPIConfig)
+        class MyAPIClient(BaseAPIClient):
+            ...
+    """
+
+    def decorator(client_cls: type) -> type:
+        _CLIENT_REGISTRY[config_cls] = client_cls
+        return client_cls
+
+    return decorator
 
 
 class APIClientFactory:
@@ -33,7 +78,7 @@ class APIClientFactory:
 
     @staticmethod
     def create_client(
-        config: Union[LocalAPIConfig, ZhipuAPIConfig, BaseAPIConfig]
+        config: Union["LocalAPIConfig", "ZhipuAPIConfig", BaseAPIConfig]
     ) -> BaseAPIClient:
         """
         根据配置创建对应的 API 客户端。
@@ -47,9 +92,20 @@ class APIClientFactory:
         Raises:
             ValueError: 如果提供商类型不支持
         """
-        if isinstance(config, LocalAPIConfig) or config.provider == APIProvider.LOCAL:
+        # 注册表命中（提供商模块已导入并自注册）时 O(1) 分发
+        client_cls = _CLIENT_REGISTRY.get(type(config))
+        if client_cls is not None:
+            return client_cls(config)
+
+        # 未命中时按 provider 懒加载对应模块（导入即自注册），
+        # 只导入命中的提供商模块
+        if config.provider == APIProvider.LOCAL:
+            from phone_agent.model.local_client import LocalAPIClient
+
             return LocalAPIClient(config)
-        elif isinstance(config, ZhipuAPIConfig) or config.provider == APIProvider.ZHIPU:
+        elif config.provider == APIProvider.ZHIPU:
+            from phone_agent.model.zhipu_client import ZhipuAPIClient
+
             return ZhipuAPIClient(config)
         else:
             raise ValueError(f"不支持的 API 提供商: {config.provider}")
@@ -86,9 +142,13 @@ class APIClientFactory:
             )
 
         if provider == APIProvider.LOCAL:
+            from phone_agent.model.local_client import LocalAPIClient, LocalAPIConfig
+
             config = LocalAPIConfig(**config_dict)
             return LocalAPIClient(config)
         elif provider == APIProvider.ZHIPU:
+            from phone_agent.model.zhipu_client import ZhipuAPIClient, ZhipuAPIConfig
+
             config = ZhipuAPIConfig(**config_dict)
             return ZhipuAPIClient(config)
         else:
@@ -118,6 +178,8 @@ class APIClientFactory:
 
         # 如果设置了智谱 Key，自动使用智谱 AI
         if zhipu_key or provider_str == "zhipu":
+            from phone_agent.model.zhipu_client import ZhipuAPIClient, ZhipuAPIConfig
+
             config = ZhipuAPIConfig(
                 api_key=zhipu_key or os.getenv("PHONE_AGENT_API_KEY", ""),
                 model_name=os.getenv("PHONE_AGENT_MODEL", "glm-4.6v"),
@@ -126,6 +188,8 @@ class APIClientFactory:
             return ZhipuAPIClient(config)
 
         # 默认使用本地 API
+        from phone_agent.model.local_client import LocalAPIClient, LocalAPIConfig
+
         config = LocalAPIConfig(
             base_url=os.getenv("PHONE_AGENT_BASE_URL", "http://localhost:8000/v1"),
             api_key=os.getenv("PHONE_AGENT_API_KEY", "EMPTY"),
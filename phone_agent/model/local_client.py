@@ -3,12 +3,17 @@
 from dataclasses import dataclass, field
 from typing import Any
 
-from openai import OpenAI
+from phone_agent.model.base import (
+    BaseAPIClient,
+    BaseAPIConfig,
+    ModelResponse,
+    _get_async_openai_client,
+    _get_openai_client,
+)
+from phone_agent.model.factory import register_client
 
-from phone_agent.model.base import BaseAPIClient, BaseAPIConfig, ModelResponse
 
-
-@dataclass
+@dataclass(slots=True)
 class LocalAPIConfig(BaseAPIConfig):
     """本地/自建服务器 API 配置。"""
 
@@ -24,6 +29,7 @@ class LocalAPIConfig(BaseAPIConfig):
         self.provider = APIProvider.LOCAL
 
 
+@register_client(LocalAPIConfig)
 class LocalAPIClient(BaseAPIClient):
     """
     本地或自建服务器的 API 客户端。
@@ -48,11 +54,12 @@ class LocalAPIClient(BaseAPIClient):
         """
         super().__init__(config)
         self.config: LocalAPIConfig = config  # 类型提示
-        self.client = OpenAI(
-            base_url=self.config.base_url, 
-            api_key=self.config.api_key,
-            timeout=self.config.timeout,
-            max_retries=self.config.max_retries,
+        # 复用按连接参数缓存的 OpenAI 客户端（共享连接池）
+        self.client = _get_openai_client(
+            self.config.base_url,
+            self.config.api_key,
+            self.config.timeout,
+            self.config.max_retries,
         )
 
     def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
@@ -69,6 +76,13 @@ class LocalAPIClient(BaseAPIClient):
             ValueError: 如果响应解析失败
             ConnectionError: 如果连接失败
         """
+        cache_key = None
+        if self.config.enable_cache:
+            cache_key = self._cache_key(messages)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             response = self.client.chat.completions.create(
                 messages=messages,
@@ -85,6 +99,121 @@ class LocalAPIClient(BaseAPIClient):
             # 解析思考和动作
             thinking, action = self._parse_response(raw_content)
 
+            result = ModelResponse(
+                thinking=thinking,
+                action=action,
+                raw_content=raw_content,
+                provider=self.get_provider_name(),
+                model_name=self.config.model_name,
+            )
+
+            if cache_key is not None:
+                self._cache_put(cache_key, result)
+            return result
+
+        except Exception as e:
+            raise ConnectionError(f"本地 API 请求失败: {str(e)}") from e
+
+    def request_batch(
+        self, messages: list[dict[str, Any]], n: int = 1
+    ) -> list[ModelResponse]:
+        """
+        一次请求取回 n 条补全。
+
+        vLLM/SGLang 支持 n= 参数，K 条补全共享一次 TLS 往返和
+        prompt prefill（服务端 KV 缓存前缀复用），比 K 次独立请求便宜得多。
+        """
+        if n <= 1:
+            return [self.request(messages)]
+
+        try:
+            response = self.client.chat.completions.create(
+                messages=messages,
+                model=self.config.model_name,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                top_p=self.config.top_p,
+                frequency_penalty=self.config.frequency_penalty,
+                extra_body=self.config.extra_body,
+                n=n,
+            )
+
+            results = []
+            for choice in response.choices:
+                raw_content = choice.message.content
+                thinking, action = self._parse_response(raw_content)
+                results.append(
+                    ModelResponse(
+                        thinking=thinking,
+                        action=action,
+                        raw_content=raw_content,
+                        provider=self.get_provider_name(),
+                        model_name=self.config.model_name,
+                    )
+                )
+            return results
+
+        except Exception as e:
+            raise ConnectionError(f"本地 API 请求失败: {str(e)}") from e
+
+    def stream_request(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        流式请求本地 API，解析到 </answer> 即返回，不等整个补全收尾。
+
+        对长输出可以把感知延迟压到结束标签出现的时刻；复用同一个
+        连接池，额外开销为零。
+        """
+        try:
+            stream = self.client.chat.completions.create(
+                messages=messages,
+                model=self.config.model_name,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                top_p=self.config.top_p,
+                frequency_penalty=self.config.frequency_penalty,
+                extra_body=self.config.extra_body,
+                stream=True,
+            )
+            raw_content = self._consume_stream(stream)
+        except Exception as e:
+            raise ConnectionError(f"本地 API 请求失败: {str(e)}") from e
+
+        thinking, action = self._parse_response(raw_content)
+        return ModelResponse(
+            thinking=thinking,
+            action=action,
+            raw_content=raw_content,
+            provider=self.get_provider_name(),
+            model_name=self.config.model_name,
+        )
+
+    async def arequest(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        异步发送请求到本地 API（参数与 request 相同）。
+
+        AsyncOpenAI 客户端在首次调用时才构造，按连接参数缓存复用。
+        """
+        async_client = _get_async_openai_client(
+            self.config.base_url,
+            self.config.api_key,
+            self.config.timeout,
+            self.config.max_retries,
+        )
+
+        try:
+            response = await async_client.chat.completions.create(
+                messages=messages,
+                model=self.config.model_name,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                top_p=self.config.top_p,
+                frequency_penalty=self.config.frequency_penalty,
+                extra_body=self.config.extra_body,
+            )
+
+            raw_content = response.choices[0].message.content
+            thinking, action = self._parse_response(raw_content)
+
             return ModelResponse(
                 thinking=thinking,
                 action=action,
@@ -96,10 +225,14 @@ class LocalAPIClient(BaseAPIClient):
         except Exception as e:
             raise ConnectionError(f"本地 API 请求失败: {str(e)}") from e
 
-    def validate_config(self) -> bool:
+    def validate_config(self, probe: bool = False) -> bool:
         """
         验证本地 API 配置。
-        
+
+        Args:
+            probe: 为 True 时额外发送一次 models.list() 验证连通性，
+                默认只做本地字段检查，省掉一次 HTTP 往返。
+
         Returns:
             bool: 配置是否有效
         """
@@ -111,6 +244,9 @@ class LocalAPIClient(BaseAPIClient):
             print("错误: model_name 不能为空")
             return False
 
+        if not probe:
+            return True
+
         # 尝试连接到 API
         try:
             # 发送一个简单的测试请求
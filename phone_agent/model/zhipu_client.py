@@ -1,15 +1,67 @@
 """智谱 AI API 客户端。"""
 
 import base64
+import gzip
+import os
 from dataclasses import dataclass
 from typing import Any
 
-from openai import OpenAI
+import httpx
 
-from phone_agent.model.base import BaseAPIClient, BaseAPIConfig, ModelResponse
+from phone_agent.model.base import (
+    BaseAPIClient,
+    BaseAPIConfig,
+    ModelResponse,
+    _get_async_openai_client,
+    _get_openai_client,
+)
+from phone_agent.model.factory import register_client
 
+# 追加到最后一条用户消息的输出格式提醒（GLM-4V 通用模型需要）
+_FORMAT_HINT = "\n\n请务必使用 <think>...</think> 和 <answer>...</answer> 格式输出。"
 
-@dataclass
+# 只接受 model + messages 基本参数的模型，
+# 传 temperature/max_tokens 等会触发 1210 错误
+_MINIMAL_PARAM_MODELS = frozenset({"glm-4.6v", "glm-4.5v", "glm-4v-plus", "glm-4v"})
+
+# 请求体小于该阈值时不做压缩（压缩收益抵不过 CPU 开销）
+_GZIP_MIN_BYTES = 16 * 1024
+
+
+class _GzipTransport(httpx.BaseTransport):
+    """
+    对大请求体做 gzip 压缩的 httpx 传输层。
+
+    多模态请求携带的 base64 截图通常有几百 KB 且高度可压缩（约可压到
+    原始大小的 25-40%），压缩后能明显减少上行字节数和首包延迟。
+    """
+
+    def __init__(self, inner: httpx.BaseTransport | None = None):
+        self._inner = inner or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if "content-encoding" not in request.headers:
+            body = request.read()
+            if len(body) >= _GZIP_MIN_BYTES:
+                compressed = gzip.compress(body, compresslevel=6)
+                if len(compressed) < len(body):
+                    headers = request.headers.copy()
+                    headers["Content-Encoding"] = "gzip"
+                    headers["Content-Length"] = str(len(compressed))
+                    request = httpx.Request(
+                        request.method,
+                        request.url,
+                        headers=headers,
+                        content=compressed,
+                        extensions=request.extensions,
+                    )
+        return self._inner.handle_request(request)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+@dataclass(slots=True)
 class ZhipuAPIConfig(BaseAPIConfig):
     """智谱 AI API 配置。"""
 
@@ -17,6 +69,7 @@ class ZhipuAPIConfig(BaseAPIConfig):
     base_url: str = "https://open.bigmodel.cn/api/paas/v4"
     model_name: str = "glm-4.6v"
     temperature: float = 0.95  # 智谱 AI 默认值，不能为 0
+    gzip_request: bool = False  # 对大请求体（base64 截图）启用 gzip 压缩上传
 
     def __post_init__(self):
         """初始化后处理。"""
@@ -38,6 +91,7 @@ class ZhipuAPIConfig(BaseAPIConfig):
             )
 
 
+@register_client(ZhipuAPIConfig)
 class ZhipuAPIClient(BaseAPIClient):
     """
     智谱 AI 官方 API 客户端。
@@ -67,17 +121,28 @@ class ZhipuAPIClient(BaseAPIClient):
         self.config: ZhipuAPIConfig = config  # 类型提示
 
         # 如果没有设置 API Key，尝试从环境变量获取
-        import os
-
         if self.config.api_key == "EMPTY" or not self.config.api_key:
             self.config.api_key = os.getenv("ZHIPU_API_KEY", "")
 
-        self.client = OpenAI(
-            base_url=self.config.base_url,
-            api_key=self.config.api_key,
-            timeout=self.config.timeout,
-            max_retries=self.config.max_retries,
-        )
+        if self.config.gzip_request:
+            # gzip 传输层是每实例的，不走共享客户端缓存
+            from openai import OpenAI
+
+            self.client = OpenAI(
+                base_url=self.config.base_url,
+                api_key=self.config.api_key,
+                timeout=self.config.timeout,
+                max_retries=self.config.max_retries,
+                http_client=httpx.Client(transport=_GzipTransport()),
+            )
+        else:
+            # 复用按连接参数缓存的 OpenAI 客户端（共享连接池）
+            self.client = _get_openai_client(
+                self.config.base_url,
+                self.config.api_key,
+                self.config.timeout,
+                self.config.max_retries,
+            )
 
     def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
         """
@@ -93,6 +158,13 @@ class ZhipuAPIClient(BaseAPIClient):
             ValueError: 如果响应解析失败
             ConnectionError: 如果连接失败或 API Key 无效
         """
+        cache_key = None
+        if self.config.enable_cache:
+            cache_key = self._cache_key(messages)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
         # 转换图片格式以兼容智谱 AI
         processed_messages = self._process_messages(messages)
 
@@ -109,9 +181,7 @@ class ZhipuAPIClient(BaseAPIClient):
             # 智谱 AI API 参数
             # 重要发现：glm-4v-plus 只支持最基本的 model 和 messages 参数
             # 不支持 temperature, max_tokens, top_p 等参数！
-            # 传递这些参数会导致 1210 错误
-            minimal_models = {"glm-4.6v", "glm-4.5v", "glm-4v-plus", "glm-4v"}
-            if model_name in minimal_models:
+            if model_name in _MINIMAL_PARAM_MODELS:
                 api_params = {
                     "model": model_name,
                     "messages": processed_messages,
@@ -126,8 +196,8 @@ class ZhipuAPIClient(BaseAPIClient):
                 if self.config.max_tokens:
                     api_params["max_tokens"] = self.config.max_tokens
             
-            # 调试输出（可选）
-            import os
+            # 调试输出（可选）。环境变量每次请求都查一次，
+            # 这样调试脚本可以在客户端构造之后再打开开关
             if os.getenv("DEBUG_ZHIPU_API"):
                 print(f"[DEBUG] API 参数: {api_params}")
                 print(f"[DEBUG] 消息数量: {len(processed_messages)}")
@@ -146,7 +216,7 @@ class ZhipuAPIClient(BaseAPIClient):
             # 解析思考和动作
             thinking, action = self._parse_response(raw_content)
 
-            return ModelResponse(
+            result = ModelResponse(
                 thinking=thinking,
                 action=action,
                 raw_content=raw_content,
@@ -154,6 +224,10 @@ class ZhipuAPIClient(BaseAPIClient):
                 model_name=self.config.model_name,
             )
 
+            if cache_key is not None:
+                self._cache_put(cache_key, result)
+            return result
+
         except Exception as e:
             error_msg = str(e)
             
@@ -182,6 +256,80 @@ class ZhipuAPIClient(BaseAPIClient):
             
             raise ConnectionError(f"智谱 AI API 请求失败: {error_msg}") from e
 
+    def stream_request(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        流式请求智谱 AI API，解析到 </answer> 即返回。
+
+        对长输出可以把感知延迟压到结束标签出现的时刻。
+        """
+        processed_messages = self._process_messages(messages)
+        api_params: dict[str, Any] = {
+            "model": self.config.model_name,
+            "messages": processed_messages,
+            "stream": True,
+        }
+        if self.config.model_name not in _MINIMAL_PARAM_MODELS:
+            if self.config.temperature is not None:
+                api_params["temperature"] = self.config.temperature
+            if self.config.max_tokens:
+                api_params["max_tokens"] = self.config.max_tokens
+
+        try:
+            stream = self.client.chat.completions.create(**api_params)
+            raw_content = self._consume_stream(stream)
+        except Exception as e:
+            raise ConnectionError(f"智谱 AI API 请求失败: {str(e)}") from e
+
+        thinking, action = self._parse_response(raw_content)
+        return ModelResponse(
+            thinking=thinking,
+            action=action,
+            raw_content=raw_content,
+            provider=self.get_provider_name(),
+            model_name=self.config.model_name,
+        )
+
+    async def arequest(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """
+        异步发送请求到智谱 AI API（参数与 request 相同）。
+
+        AsyncOpenAI 客户端在首次调用时才构造，按连接参数缓存复用。
+        """
+        async_client = _get_async_openai_client(
+            self.config.base_url,
+            self.config.api_key,
+            self.config.timeout,
+            self.config.max_retries,
+        )
+
+        processed_messages = self._process_messages(messages)
+        api_params: dict[str, Any] = {
+            "model": self.config.model_name,
+            "messages": processed_messages,
+        }
+        if self.config.model_name not in _MINIMAL_PARAM_MODELS:
+            if self.config.temperature is not None:
+                api_params["temperature"] = self.config.temperature
+            if self.config.max_tokens:
+                api_params["max_tokens"] = self.config.max_tokens
+
+        try:
+            response = await async_client.chat.completions.create(**api_params)
+
+            raw_content = response.choices[0].message.content
+            thinking, action = self._parse_response(raw_content)
+
+            return ModelResponse(
+                thinking=thinking,
+                action=action,
+                raw_content=raw_content,
+                provider=self.get_provider_name(),
+                model_name=self.config.model_name,
+            )
+
+        except Exception as e:
+            raise ConnectionError(f"智谱 AI API 请求失败: {str(e)}") from e
+
     def _process_messages(
         self, messages: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
@@ -200,8 +348,13 @@ class ZhipuAPIClient(BaseAPIClient):
         Returns:
             处理后的消息列表
         """
+        # 快速路径: 消息通常已经是规范格式（上一步就是这里产出的），
+        # 一趟只读扫描确认后直接复用原列表，不做逐条 copy/重建
+        if not self._needs_rewrite(messages):
+            return self._append_format_hint(messages)
+
         processed = []
-        
+
         for message in messages:
             # 复制消息以避免修改原始数据
             msg = message.copy()
@@ -259,31 +412,77 @@ class ZhipuAPIClient(BaseAPIClient):
 
             processed.append(msg)
 
-        # 强化提示：如果最后一条消息是用户消息，追加格式提醒
-        # 这对于 GLM-4V 通用模型很重要，因为它不像 AutoGLM 专用模型那样经过特定格式微调
-        if processed and processed[-1]["role"] == "user":
-            last_msg = processed[-1]
-            format_hint = "\n\n请务必使用 <think>...</think> 和 <answer>...</answer> 格式输出。"
-            
-            if isinstance(last_msg["content"], str):
-                last_msg["content"] += format_hint
-            elif isinstance(last_msg["content"], list):
-                # 找到最后一个 text 块追加，或者新增一个 text 块
-                text_found = False
-                for item in reversed(last_msg["content"]):
-                    if item.get("type") == "text":
-                        item["text"] += format_hint
-                        text_found = True
-                        break
-                if not text_found:
-                    last_msg["content"].append({"type": "text", "text": format_hint})
-
-        return processed
-
-    def validate_config(self) -> bool:
+        return self._append_format_hint(processed)
+
+    @staticmethod
+    def _needs_rewrite(messages: list[dict[str, Any]]) -> bool:
+        """一趟扫描判断消息列表是否需要清洗（缺字段/空文本/未 strip 等）。"""
+        for message in messages:
+            if "role" not in message:
+                return True
+            content = message.get("content")
+            if isinstance(content, str):
+                if not content or content != content.strip():
+                    return True
+            elif isinstance(content, list):
+                if not content:
+                    return True
+                for item in content:
+                    item_type = item.get("type")
+                    if item_type == "image_url":
+                        if not item.get("image_url", {}).get("url", ""):
+                            return True
+                    elif item_type == "text":
+                        text = item.get("text", "")
+                        if not text or text != text.strip():
+                            return True
+            else:
+                return True
+        return False
+
+    @staticmethod
+    def _append_format_hint(
+        processed: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        强化提示：如果最后一条消息是用户消息，追加格式提醒。
+
+        这对于 GLM-4V 通用模型很重要，因为它不像 AutoGLM 专用模型那样
+        经过特定格式微调。
+
+        不修改调用方的消息：带提示的末条消息是新构造的 dict/列表
+        （{**last_msg, ...}），其余消息原样共享，下一轮请求拿到的
+        上下文不会被悄悄改写。
+        """
+        if not processed or processed[-1]["role"] != "user":
+            return processed
+
+        last_msg = processed[-1]
+        content = last_msg["content"]
+        if isinstance(content, str):
+            hinted = {**last_msg, "content": content + _FORMAT_HINT}
+        elif isinstance(content, list):
+            if content and content[-1].get("type") == "text":
+                last_item = content[-1]
+                new_content = content[:-1] + [
+                    {**last_item, "text": last_item["text"] + _FORMAT_HINT}
+                ]
+            else:
+                new_content = content + [{"type": "text", "text": _FORMAT_HINT}]
+            hinted = {**last_msg, "content": new_content}
+        else:
+            return processed
+
+        return processed[:-1] + [hinted]
+
+    def validate_config(self, probe: bool = False) -> bool:
         """
         验证智谱 AI 配置。
-        
+
+        Args:
+            probe: 为 True 时额外发送一次 models.list() 验证连通性，
+                默认只做本地字段检查，省掉一次 HTTPS 往返。
+
         Returns:
             bool: 配置是否有效
         """
@@ -296,6 +495,10 @@ class ZhipuAPIClient(BaseAPIClient):
             print("✗ 错误: model_name 不能为空")
             return False
 
+        if not probe:
+            print(f"✓ 使用模型: {self.config.model_name}")
+            return True
+
         # 尝试连接到智谱 AI API
         try:
             # 发送一个简单的测试请求来验证连接
@@ -0,0 +1,250 @@
+"""调试/诊断脚本共用的小工具。"""
+
+import functools
+import json
+import os
+import random
+import time
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+# 智谱开放平台的 OpenAI 兼容端点
+ZHIPU_BASE_URL = "https://open.bigmodel.cn/api/paas/v4"
+
+# 预计算的分隔线，免得每个 print 都重新做一次字符串乘法
+BAR70 = "=" * 70
+BAR60 = "=" * 60
+
+
+def banner(title, bar: str = BAR70, leading: str = "\n") -> None:
+    """打印三行式标题横幅，收敛各脚本重复的分隔线样板。"""
+    print(f"{leading}{bar}\n{title}\n{bar}")
+
+# 1x1 透明像素 PNG 的 data URL，各脚本共用同一份测试图片，
+# 保证多模态探测发送的 payload 完全一致
+TINY_PNG_DATA_URL = (
+    "data:image/png;base64,"
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8"
+    "/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
+)
+
+
+@functools.cache
+def require_api_key() -> str:
+    """
+    读取并缓存 ZHIPU_API_KEY，未设置时统一提示并退出。
+
+    各脚本（甚至同一脚本的多个测试函数）原本各自 getenv + 分支提示，
+    并发执行时会把"未设置"打印多遍。进程内缓存后只查一次环境变量。
+    """
+    api_key = os.environ.get("ZHIPU_API_KEY")
+    if not api_key:
+        print("❌ 未设置 ZHIPU_API_KEY 环境变量")
+        print("请运行: export ZHIPU_API_KEY='your-api-key'")
+        raise SystemExit(1)
+    return api_key
+
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        # orjson 在 C 层直接写 UTF-8，对带 base64 图片的大消息体
+        # 比 stdlib json 快一个数量级
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:  # orjson 是可选依赖，缺席时退回 stdlib
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def dlog(obj) -> None:
+    """
+    仅在 DEBUG_ZHIPU_API 开启时序列化并打印对象。
+
+    多模态消息里带着几 KB 的 base64 图片，无条件 json.dumps 等于
+    每次调用都白做一遍大字符串序列化。每次调用重读环境变量，
+    和 ZhipuAPIClient 一样允许脚本中途开关调试。
+    """
+    if os.environ.get("DEBUG_ZHIPU_API"):
+        print(_dumps(obj))
+
+
+# 单脚本探测用不上 httpx 默认的 100 连接池，10 条足够并发探测共享；
+# connect 单独收紧到 10s，端点不可达时不用陪整个 120s 读超时
+_HTTP_LIMITS_KW = dict(max_connections=10, max_keepalive_connections=10)
+_HTTP_TIMEOUT_KW = dict(timeout=120.0, connect=10.0)
+
+
+def get_client(api_key: str, **kwargs):
+    """构造指向智谱端点的同步 OpenAI 客户端（收紧的连接池/超时配置）。"""
+    import httpx
+    from openai import OpenAI
+
+    kwargs.setdefault(
+        "http_client",
+        httpx.Client(
+            limits=httpx.Limits(**_HTTP_LIMITS_KW),
+            timeout=httpx.Timeout(**_HTTP_TIMEOUT_KW),
+        ),
+    )
+    return OpenAI(base_url=ZHIPU_BASE_URL, api_key=api_key, **kwargs)
+
+
+def get_async_client(api_key: str, **kwargs):
+    """get_client 的异步版本。"""
+    import httpx
+    from openai import AsyncOpenAI
+
+    kwargs.setdefault(
+        "http_client",
+        httpx.AsyncClient(
+            limits=httpx.Limits(**_HTTP_LIMITS_KW),
+            timeout=httpx.Timeout(**_HTTP_TIMEOUT_KW),
+        ),
+    )
+    return AsyncOpenAI(base_url=ZHIPU_BASE_URL, api_key=api_key, **kwargs)
+
+
+# 值得重试的瞬时错误: 超时 / 限流 / 服务端 5xx / 连接问题
+_RETRYABLE_ERRORS = (
+    APITimeoutError,
+    RateLimitError,
+    APIConnectionError,
+    InternalServerError,
+)
+
+
+def _backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """第 attempt 次失败后的等待时间（指数退避 + 抖动）。"""
+    delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.5)
+
+
+def call_with_retry(
+    fn,
+    *args,
+    max_attempts: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    **kwargs,
+):
+    """
+    对瞬时网络错误做指数退避重试的调用包装。
+
+    诊断脚本的调用没有重试的话，一次 429/超时就得整个脚本重跑。
+    tenacity 不在项目依赖里，这里手写等价逻辑。
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn(*args, **kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == max_attempts:
+                raise
+            delay = _backoff_delay(attempt, base_delay, max_delay)
+            print(
+                f"  ⏳ 瞬时错误 {type(e).__name__}，"
+                f"{delay:.1f}s 后重试（{attempt}/{max_attempts - 1}）"
+            )
+            time.sleep(delay)
+
+
+def stream_probe(client, model, messages, limit: int = 80, **params) -> str:
+    """
+    流式发起探测，攒够 limit 个字符就关闭流返回。
+
+    诊断脚本只展示响应开头几十个字符，却等完整补全收尾才打印；
+    流式 + 提前断开把等待时间压到 time-to-first-token 量级。
+    """
+    stream = call_with_retry(
+        client.chat.completions.create,
+        model=model,
+        messages=messages,
+        stream=True,
+        **params,
+    )
+    buf = ""
+    try:
+        for event in stream:
+            if event.choices:
+                buf += event.choices[0].delta.content or ""
+            if len(buf) >= limit:
+                break
+    finally:
+        stream.close()
+    return buf
+
+
+async def astream_probe(client, model, messages, limit: int = 80, **params) -> str:
+    """stream_probe 的异步版本。"""
+    stream = await acall_with_retry(
+        client.chat.completions.create,
+        model=model,
+        messages=messages,
+        stream=True,
+        **params,
+    )
+    buf = ""
+    try:
+        async for event in stream:
+            if event.choices:
+                buf += event.choices[0].delta.content or ""
+            if len(buf) >= limit:
+                break
+    finally:
+        await stream.close()
+    return buf
+
+
+def cached_create(client, model, messages, **params):
+    """
+    带进程内 LRU 缓存的 chat.completions.create。
+
+    诊断脚本经常跨测试重复同一 (model, messages, 参数) 组合，
+    这些都是付费的网络调用——命中缓存时直接复用上一次的响应对象。
+    消息列表不可哈希，先做 sort_keys 的规范化 JSON 再进缓存键。
+    """
+    key_params = tuple(sorted(params.items()))
+    messages_json = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+    return _cached_create(client, model, messages_json, key_params)
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_create(client, model, messages_json, key_params):
+    return call_with_retry(
+        client.chat.completions.create,
+        model=model,
+        messages=json.loads(messages_json),
+        **dict(key_params),
+    )
+
+
+async def acall_with_retry(
+    fn,
+    *args,
+    max_attempts: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    **kwargs,
+):
+    """call_with_retry 的异步版本，fn 为返回可等待对象的调用。"""
+    import asyncio
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return await fn(*args, **kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == max_attempts:
+                raise
+            delay = _backoff_delay(attempt, base_delay, max_delay)
+            print(
+                f"  ⏳ 瞬时错误 {type(e).__name__}，"
+                f"{delay:.1f}s 后重试（{attempt}/{max_attempts - 1}）"
+            )
+            await asyncio.sleep(delay)
@@ -4,20 +4,22 @@ import os
 import sys
 import json
 
-api_key = os.getenv('ZHIPU_API_KEY')
-if not api_key:
-    print("❌ 请设置 ZHIPU_API_KEY")
-    sys.exit(1)
 
 # 启用调试模式
 os.environ['DEBUG_ZHIPU_API'] = '1'
 
+from openai import AuthenticationError, PermissionDeniedError, RateLimitError
+
 from phone_agent.model import ZhipuAPIClient, ZhipuAPIConfig
-from phone_agent.model.client import MessageBuilder
 
-print("=" * 70)
-print("模拟 PhoneAgent 的实际调用")
-print("=" * 70)
+try:
+    from scripts._common import BAR70, banner, require_api_key, call_with_retry, dlog, get_client  # 从仓库根目录运行
+except ImportError:
+    from _common import BAR70, banner, require_api_key, call_with_retry, dlog, get_client  # 直接在 scripts/ 目录下运行
+
+api_key = require_api_key()
+
+banner("模拟 PhoneAgent 的实际调用", bar=BAR70, leading='')
 
 # 创建配置（与 test_phoneAgent.py 相同）
 config = ZhipuAPIConfig(
@@ -35,9 +37,7 @@ print(f"  max_tokens: {config.max_tokens}")
 client = ZhipuAPIClient(config)
 
 # 模拟 PhoneAgent 的第一步调用
-print("\n" + "=" * 70)
-print("测试 1: 模拟简单消息（无图片）")
-print("=" * 70)
+banner("测试 1: 模拟简单消息（无图片）")
 
 messages = [
     {"role": "system", "content": "你是一个手机助手"},
@@ -45,64 +45,64 @@ messages = [
 ]
 
 print("\n发送的消息:")
-print(json.dumps(messages, ensure_ascii=False, indent=2))
+dlog(messages)
 
 try:
     response = client.request(messages)
     print("\n✅ 成功!")
-    print(f"Thinking: {response.thinking[:100] if response.thinking else '(空)'}")
-    print(f"Action: {response.action[:100] if response.action else '(空)'}")
+    thinking = response.thinking or ''
+    action = response.action or ''
+    print(f"Thinking: {thinking[:100] or '(空)'}")
+    print(f"Action: {action[:100] or '(空)'}")
 except Exception as e:
     print(f"\n❌ 失败: {e}")
-    import traceback
-    traceback.print_exc()
-    
+    # 已分类的错误不值得打整条调用栈，错误消息已足够定位
+    if not isinstance(
+        e, (AuthenticationError, PermissionDeniedError, RateLimitError, ConnectionError)
+    ):
+        import traceback
+        traceback.print_exc()
+
     # 继续测试更简单的情况
-    print("\n" + "=" * 70)
-    print("测试 2: 去掉 system 消息")
-    print("=" * 70)
+    banner("测试 2: 去掉 system 消息")
     
     simple_messages = [
         {"role": "user", "content": "打开微信"}
     ]
     
     print("\n发送的消息:")
-    print(json.dumps(simple_messages, ensure_ascii=False, indent=2))
+    dlog(simple_messages)
     
     try:
         response = client.request(simple_messages)
         print("\n✅ 成功!")
-        print(f"Thinking: {response.thinking[:100]}")
-        print(f"Action: {response.action[:100]}")
+        thinking = response.thinking or ''
+        action = response.action or ''
+        print(f"Thinking: {thinking[:100]}")
+        print(f"Action: {action[:100]}")
     except Exception as e:
         print(f"\n❌ 仍然失败: {e}")
         
         # 测试最基本的情况
-        print("\n" + "=" * 70)
-        print("测试 3: 使用 OpenAI 客户端直接调用")
-        print("=" * 70)
+        banner("测试 3: 使用 OpenAI 客户端直接调用")
         
-        from openai import OpenAI
-        direct_client = OpenAI(
-            base_url="https://open.bigmodel.cn/api/paas/v4",
-            api_key=api_key,
-        )
+        direct_client = get_client(api_key)
         
         try:
-            response = direct_client.chat.completions.create(
+            response = call_with_retry(
+                direct_client.chat.completions.create,
                 model="glm-4v-plus",
                 messages=[{"role": "user", "content": "你好"}],
                 temperature=0.7,
                 max_tokens=3000
             )
             print("\n✅ OpenAI 客户端直接调用成功!")
-            print(f"响应: {response.choices[0].message.content[:100]}")
+            content = response.choices[0].message.content or ''
+            print(f"响应: {content[:100]}")
             
             print("\n⚠️  这说明 API 本身工作正常，问题在我们的消息处理逻辑中")
         except Exception as e:
             print(f"\n❌ OpenAI 客户端也失败: {e}")
             print("\n这可能是 API Key 或账户配额问题")
 
-print("\n" + "=" * 70)
-print("调试完成")
-print("=" * 70)
+banner("调试完成")
@@ -1,67 +1,61 @@
 """调试智谱 AI API 参数问题"""
 
 import os
-from openai import OpenAI
+
+try:
+    from scripts._common import BAR60, banner, require_api_key, TINY_PNG_DATA_URL, cached_create, get_client, stream_probe  # 从仓库根目录运行
+except ImportError:
+    from _common import BAR60, banner, require_api_key, TINY_PNG_DATA_URL, cached_create, get_client, stream_probe  # 直接在 scripts/ 目录下运行
 
 # 获取 API Key
-api_key = os.getenv("ZHIPU_API_KEY")
-print(f"API Key 前10个字符: {api_key[:10] if api_key else 'None'}")
+api_key = require_api_key()
+print(f"API Key 前10个字符: {api_key[:10]}")
 
 # 创建客户端
-client = OpenAI(
-    base_url="https://open.bigmodel.cn/api/paas/v4",
-    api_key=api_key,
-)
+client = get_client(api_key)
 
 # 测试1: 最简单的文本消息
-print("\n" + "=" * 60)
-print("测试1: 纯文本消息")
-print("=" * 60)
+banner("测试1: 纯文本消息", BAR60)
 try:
-    response = client.chat.completions.create(
-        model="glm-4v-plus",
-        messages=[
-            {"role": "user", "content": "你好"}
-        ]
+    # 纯文本探测只看响应开头，流式取够 80 字符就断开
+    content = stream_probe(
+        client,
+        "glm-4v-plus",
+        [{"role": "user", "content": "你好"}],
     )
     print("✓ 成功!")
-    print(f"响应: {response.choices[0].message.content}")
+    print(f"响应: {content}")
 except Exception as e:
     print(f"✗ 失败: {e}")
 
 # 测试2: 带system消息
-print("\n" + "=" * 60)
-print("测试2: 带system消息")
-print("=" * 60)
+banner("测试2: 带system消息", BAR60)
 try:
-    response = client.chat.completions.create(
-        model="glm-4v-plus",
-        messages=[
+    content = stream_probe(
+        client,
+        "glm-4v-plus",
+        [
             {"role": "system", "content": "你是一个助手"},
-            {"role": "user", "content": "你好"}
-        ]
+            {"role": "user", "content": "你好"},
+        ],
     )
     print("✓ 成功!")
-    print(f"响应: {response.choices[0].message.content}")
+    print(f"响应: {content}")
 except Exception as e:
     print(f"✗ 失败: {e}")
 
 # 测试3: 带图片（多模态内容）
-print("\n" + "=" * 60)
-print("测试3: 带图片的消息（列表格式content）")
-print("=" * 60)
+banner("测试3: 带图片的消息（列表格式content）", BAR60)
 try:
-    # 创建一个简单的测试图片（1x1像素的白色PNG）
-    test_image_base64 = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
-    
-    response = client.chat.completions.create(
+    response = cached_create(
+        client,
         model="glm-4v-plus",
         messages=[
             {
                 "role": "user",
                 "content": [
                     {"type": "text", "text": "这是什么？"},
-                    {"type": "image_url", "image_url": {"url": test_image_base64}}
+                    {"type": "image_url", "image_url": {"url": TINY_PNG_DATA_URL}}
                 ]
             }
         ]
@@ -72,13 +66,10 @@ except Exception as e:
     print(f"✗ 失败: {e}")
 
 # 测试4: system + user with image
-print("\n" + "=" * 60)
-print("测试4: system消息 + 带图片的user消息")
-print("=" * 60)
+banner("测试4: system消息 + 带图片的user消息", BAR60)
 try:
-    test_image_base64 = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
-    
-    response = client.chat.completions.create(
+    response = cached_create(
+        client,
         model="glm-4v-plus",
         messages=[
             {"role": "system", "content": "你是一个助手"},
@@ -86,7 +77,7 @@ try:
                 "role": "user",
                 "content": [
                     {"type": "text", "text": "这是什么？"},
-                    {"type": "image_url", "image_url": {"url": test_image_base64}}
+                    {"type": "image_url", "image_url": {"url": TINY_PNG_DATA_URL}}
                 ]
             }
         ]
@@ -96,6 +87,4 @@ try:
 except Exception as e:
     print(f"✗ 失败: {e}")
 
-print("\n" + "=" * 60)
-print("诊断完成")
-print("=" * 60)
+banner("诊断完成", BAR60)
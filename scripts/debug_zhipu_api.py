@@ -1,28 +1,34 @@
 #!/usr/bin/env python3
 """调试智谱 AI API 调用问题"""
 
+import asyncio
+import functools
 import os
 import json
-from phone_agent.model import ZhipuAPIConfig, ZhipuAPIClient
+from openai import AuthenticationError, PermissionDeniedError, RateLimitError
+
+try:
+    from scripts._common import BAR60, banner, require_api_key, TINY_PNG_DATA_URL, acall_with_retry, dlog, get_async_client  # 从仓库根目录运行
+except ImportError:
+    from _common import BAR60, banner, require_api_key, TINY_PNG_DATA_URL, acall_with_retry, dlog, get_async_client  # 直接在 scripts/ 目录下运行
+
+@functools.lru_cache(maxsize=4)
+def _get_client(model_name: str, api_key: str):
+    """按 (model, key) 缓存封装客户端，避免每个测试函数重建连接池。"""
+    # 函数内导入：phone_agent.model 会连带拉起 openai/PIL 等重量级依赖，
+    # 推迟到真正要用的测试里，缺 key 的早退路径不用付这笔启动成本
+    from phone_agent.model import ZhipuAPIClient, ZhipuAPIConfig
+
+    return ZhipuAPIClient(ZhipuAPIConfig(api_key=api_key, model_name=model_name))
+
 
 def test_simple_message():
     """测试简单的文本消息"""
-    print("=" * 60)
-    print("测试 1: 简单文本消息")
-    print("=" * 60)
-    
-    api_key = os.getenv("ZHIPU_API_KEY")
-    if not api_key:
-        print("❌ 未设置 ZHIPU_API_KEY 环境变量")
-        return False
-    
-    config = ZhipuAPIConfig(
-        api_key=api_key,
-        model_name="glm-4v-plus",
-    )
-    
-    client = ZhipuAPIClient(config)
+    banner("测试 1: 简单文本消息", BAR60, leading='')
     
+    api_key = require_api_key()
+    client = _get_client("glm-4v-plus", api_key)
+
     # 简单的文本消息
     messages = [
         {"role": "system", "content": "你是一个助手"},
@@ -30,11 +36,13 @@ def test_simple_message():
     ]
     
     try:
-        print(f"发送消息到模型: {config.model_name}")
-        print(f"消息内容: {json.dumps(messages, ensure_ascii=False, indent=2)}")
+        print(f"发送消息到模型: {client.config.model_name}")
+        dlog(messages)
         
-        response = client.request(messages)
-        print(f"✅ 成功！响应: {response.raw_content[:100]}...")
+        # 用封装自带的流式接口：解析到 </answer> 即返回，不等补全收尾
+        response = client.stream_request(messages)
+        raw = response.raw_content or ''
+        print(f"✅ 成功！响应: {raw[:100]}...")
         return True
     except Exception as e:
         print(f"❌ 失败: {e}")
@@ -43,30 +51,11 @@ def test_simple_message():
 
 def test_with_image():
     """测试带图片的消息"""
-    print("\n" + "=" * 60)
-    print("测试 2: 带图片的消息")
-    print("=" * 60)
-    
-    api_key = os.getenv("ZHIPU_API_KEY")
-    if not api_key:
-        print("❌ 未设置 ZHIPU_API_KEY 环境变量")
-        return False
-    
-    config = ZhipuAPIConfig(
-        api_key=api_key,
-        model_name="glm-4v-plus",
-    )
-    
-    client = ZhipuAPIClient(config)
-    
-    # 创建一个简单的测试图片（1x1 像素的 PNG）
-    import base64
-    # 最小的 PNG 图片（1x1 透明像素）
-    minimal_png = base64.b64decode(
-        "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
-    )
-    image_base64 = base64.b64encode(minimal_png).decode('utf-8')
+    banner("测试 2: 带图片的消息", BAR60)
     
+    api_key = require_api_key()
+    client = _get_client("glm-4v-plus", api_key)
+
     messages = [
         {"role": "system", "content": "你是一个助手"},
         {
@@ -74,7 +63,7 @@ def test_with_image():
             "content": [
                 {
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
+                    "image_url": {"url": TINY_PNG_DATA_URL},
                 },
                 {"type": "text", "text": "这是什么？"},
             ],
@@ -82,12 +71,17 @@ def test_with_image():
     ]
     
     try:
-        print(f"发送消息到模型: {config.model_name}")
+        print(f"发送消息到模型: {client.config.model_name}")
         print(f"消息包含图片")
         
         response = client.request(messages)
-        print(f"✅ 成功！响应: {response.raw_content[:100]}...")
+        raw = response.raw_content or ''
+        print(f"✅ 成功！响应: {raw[:100]}...")
         return True
+    except (AuthenticationError, PermissionDeniedError, RateLimitError, ConnectionError) as e:
+        # 已分类的错误消息本身就说明了问题，整条调用栈没有增量信息
+        print(f"❌ 失败: {e}")
+        return False
     except Exception as e:
         print(f"❌ 失败: {e}")
         import traceback
@@ -97,14 +91,9 @@ def test_with_image():
 
 def test_different_models():
     """测试不同的模型名称"""
-    print("\n" + "=" * 60)
-    print("测试 3: 不同的模型名称")
-    print("=" * 60)
+    banner("测试 3: 不同的模型名称", BAR60)
     
-    api_key = os.getenv("ZHIPU_API_KEY")
-    if not api_key:
-        print("❌ 未设置 ZHIPU_API_KEY 环境变量")
-        return False
+    api_key = require_api_key()
     
     # 尝试不同的模型名称
     model_names = [
@@ -117,49 +106,63 @@ def test_different_models():
         {"role": "system", "content": "你是一个助手"},
         {"role": "user", "content": "你好"},
     ]
-    
-    for model_name in model_names:
-        print(f"\n尝试模型: {model_name}")
+
+    # 并发探测全部模型并给出完整可用性表——串行版在第一个成功后
+    # 就返回，看不到其余模型的状态；共用一个客户端（一个连接池）
+    aclient = get_async_client(api_key)
+
+    async def probe(model_name):
         try:
-            config = ZhipuAPIConfig(
-                api_key=api_key,
-                model_name=model_name,
+            await acall_with_retry(
+                aclient.chat.completions.create,
+                model=model_name,
+                messages=messages,
             )
-            client = ZhipuAPIClient(config)
-            response = client.request(messages)
-            print(f"✅ {model_name} 可用！")
-            return True
+            return model_name, True, None
         except Exception as e:
-            print(f"❌ {model_name} 失败: {str(e)[:100]}")
-    
-    return False
+            return model_name, False, str(e)[:100]
+
+    async def _fan_out():
+        return await asyncio.gather(*(probe(m) for m in model_names))
+
+    results = asyncio.run(_fan_out())
+
+    print("\n模型可用性:")
+    for model_name, ok, err in results:
+        if ok:
+            print(f"  ✅ {model_name} 可用")
+        else:
+            print(f"  ❌ {model_name} 失败: {err}")
+
+    return any(ok for _, ok, _ in results)
 
 
 def main():
     """运行所有测试"""
-    print("\n" + "=" * 60)
-    print("智谱 AI API 调试工具")
-    print("=" * 60)
+    banner("智谱 AI API 调试工具", BAR60)
     
     # 检查 API Key
-    api_key = os.getenv("ZHIPU_API_KEY")
-    if not api_key:
-        print("❌ 错误: 未设置 ZHIPU_API_KEY 环境变量")
-        print("请运行: export ZHIPU_API_KEY='your-api-key'")
-        return
-    
+    api_key = require_api_key()
     print(f"✓ API Key: {api_key[:8]}...{api_key[-4:]}")
-    
-    # 运行测试
-    results = []
-    results.append(("简单文本消息", test_simple_message()))
-    results.append(("带图片消息", test_with_image()))
-    results.append(("不同模型名称", test_different_models()))
+
+    # 三个测试相互独立且纯网络受限，放进线程并发执行，
+    # 总耗时从三者之和压到最慢一项（输出可能交错）
+    async def _run_tests():
+        return await asyncio.gather(
+            asyncio.to_thread(test_simple_message),
+            asyncio.to_thread(test_with_image),
+            asyncio.to_thread(test_different_models),
+        )
+
+    r1, r2, r3 = asyncio.run(_run_tests())
+    results = [
+        ("简单文本消息", r1),
+        ("带图片消息", r2),
+        ("不同模型名称", r3),
+    ]
     
     # 总结
-    print("\n" + "=" * 60)
-    print("测试总结")
-    print("=" * 60)
+    banner("测试总结", BAR60)
     for name, result in results:
         status = "✅ 通过" if result else "❌ 失败"
         print(f"{name}: {status}")
@@ -1,40 +1,103 @@
 """诊断并修复智谱 AI API 1210 错误"""
 
+import asyncio
 import os
-import json
-from openai import OpenAI
+
+try:
+    from scripts._common import banner, require_api_key, TINY_PNG_DATA_URL, acall_with_retry, astream_probe, get_async_client  # 从仓库根目录运行
+except ImportError:
+    from _common import banner, require_api_key, TINY_PNG_DATA_URL, acall_with_retry, astream_probe, get_async_client  # 直接在 scripts/ 目录下运行
 
 def print_section(title):
-    print("\n" + "=" * 70)
-    print(f"  {title}")
-    print("=" * 70)
+    banner(f"  {title}")
+
+
+_MM_CONTENT = [
+    {"type": "text", "text": "这是什么？"},
+    {"type": "image_url", "image_url": {"url": TINY_PNG_DATA_URL}},
+]
+
+# 探测矩阵: (标题, 请求参数, 成功说明, 1210 错误提示, 是否关键)
+# 五段几乎一样的 try/except 样板收敛成一张表，加探测只需加一行
+PROBES = [
+    (
+        "测试 2: 带 system 消息",
+        {
+            "messages": [
+                {"role": "system", "content": "你是助手"},
+                {"role": "user", "content": "你好"},
+            ]
+        },
+        "✓ 成功 - 支持 system 消息",
+        "⚠️  glm-4v-plus 可能不支持 system 消息",
+        True,
+    ),
+    (
+        "测试 3: 多模态（文本+图片）",
+        {"messages": [{"role": "user", "content": _MM_CONTENT}]},
+        "✓ 成功 - 支持多模态",
+        "⚠️  content 列表格式可能有问题",
+        True,
+    ),
+    (
+        "测试 4: 带可选参数（temperature, max_tokens）",
+        {
+            "messages": [{"role": "user", "content": "你好"}],
+            "temperature": 0.7,
+            "max_tokens": 100,
+        },
+        "✓ 成功 - 支持 temperature 和 max_tokens",
+        "⚠️  某些参数不被支持",
+        False,
+    ),
+]
 
-def test_api():
-    api_key = os.getenv("ZHIPU_API_KEY")
-    
+SYS_MM_PROBE = (
+    "测试 5: system + 多模态",
+    {
+        "messages": [
+            {"role": "system", "content": "你是图片分析助手"},
+            {"role": "user", "content": _MM_CONTENT},
+        ]
+    },
+    "✓ 成功 - 支持 system + 多模态组合",
+    "⚠️  system + 多模态组合不被支持\n  建议: 将 system 内容合并到 user 消息中",
+    False,
+)
+
+
+async def run_probe(client, probe):
+    """执行一项探测，统一 try/except 与 1210 错误提示。"""
+    title, kwargs, ok_note, hint_1210, critical = probe
+    try:
+        await acall_with_retry(
+            client.chat.completions.create, model="glm-4v-plus", **kwargs
+        )
+        return title, True, ok_note, critical
+    except Exception as e:
+        note = f"✗ 失败: {e}"
+        if "1210" in str(e):
+            note += f"\n  {hint_1210}"
+        return title, False, note, critical
+
+async def test_api():
     print_section("环境检查")
-    if not api_key:
-        print("❌ ZHIPU_API_KEY 未设置")
-        print("\n请运行:")
-        print("  export ZHIPU_API_KEY='your-api-key'")
-        return False
-    
+    api_key = require_api_key()
     print(f"✓ API Key: {api_key[:15]}...{api_key[-4:]}")
-    
-    client = OpenAI(
-        base_url="https://open.bigmodel.cn/api/paas/v4",
-        api_key=api_key,
-    )
-    
-    # 测试 1: 最基本的请求
+
+    client = get_async_client(api_key)
+
+    # 测试 1: 最基本的请求（作为门槛串行执行，失败说明是 Key/配额问题）
     print_section("测试 1: 最基本的文本请求")
     try:
-        response = client.chat.completions.create(
-            model="glm-4v-plus",
-            messages=[{"role": "user", "content": "你好"}]
+        # 门槛测试只看响应开头，流式取够 80 字符就断开
+        content = await astream_probe(
+            client,
+            "glm-4v-plus",
+            [{"role": "user", "content": "你好"}],
         )
         print(f"✓ 成功")
-        print(f"  响应: {response.choices[0].message.content[:80]}")
+        print(f"  响应: {content[:80]}")
     except Exception as e:
         print(f"✗ 失败: {e}")
         if "1210" in str(e):
@@ -43,93 +106,42 @@ def test_api():
             print("  2. API Key 权限不足")
             print("  3. 账户配额问题")
         return False
-    
-    # 测试 2: 带 system 消息
-    print_section("测试 2: 带 system 消息")
-    try:
-        response = client.chat.completions.create(
-            model="glm-4v-plus",
-            messages=[
-                {"role": "system", "content": "你是助手"},
-                {"role": "user", "content": "你好"}
-            ]
-        )
-        print(f"✓ 成功 - 支持 system 消息")
-    except Exception as e:
-        print(f"✗ 失败: {e}")
-        if "1210" in str(e):
-            print("  ⚠️  glm-4v-plus 可能不支持 system 消息")
-            return False
-    
-    # 测试 3: 多模态（图片）
-    print_section("测试 3: 多模态（文本+图片）")
-    try:
-        test_img = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
-        response = client.chat.completions.create(
-            model="glm-4v-plus",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "这是什么？"},
-                        {"type": "image_url", "image_url": {"url": test_img}}
-                    ]
-                }
-            ]
-        )
-        print(f"✓ 成功 - 支持多模态")
-    except Exception as e:
-        print(f"✗ 失败: {e}")
-        if "1210" in str(e):
-            print("  ⚠️  content 列表格式可能有问题")
-            return False
-    
-    # 测试 4: 带参数
-    print_section("测试 4: 带可选参数（temperature, max_tokens）")
-    try:
-        response = client.chat.completions.create(
-            model="glm-4v-plus",
-            messages=[{"role": "user", "content": "你好"}],
-            temperature=0.7,
-            max_tokens=100
-        )
-        print(f"✓ 成功 - 支持 temperature 和 max_tokens")
-    except Exception as e:
-        print(f"✗ 失败: {e}")
-        if "1210" in str(e):
-            print("  ⚠️  某些参数不被支持")
-    
-    # 测试 5: system + 多模态
-    print_section("测试 5: system + 多模态")
-    try:
-        test_img = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
-        response = client.chat.completions.create(
-            model="glm-4v-plus",
-            messages=[
-                {"role": "system", "content": "你是图片分析助手"},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "分析图片"},
-                        {"type": "image_url", "image_url": {"url": test_img}}
-                    ]
-                }
-            ]
+
+    # 测试 2-5 相互独立且纯网络受限，并发发出，
+    # 总耗时从各测试之和压到最慢一项
+    results = list(
+        await asyncio.gather(*(run_probe(client, probe) for probe in PROBES))
+    )
+
+    # 测试 5 依赖测试 2 和 3：system 或多模态单独就不通时，
+    # 组合测试必然失败，直接跳过，省掉一次最长 120s 的超时等待
+    system_ok = results[0][1]
+    multimodal_ok = results[1][1]
+    if system_ok and multimodal_ok:
+        results.append(await run_probe(client, SYS_MM_PROBE))
+    else:
+        results.append(
+            (
+                "测试 5: system + 多模态",
+                None,
+                "⏭️  跳过 - 前置测试（system / 多模态）未通过",
+                False,
+            )
         )
-        print(f"✓ 成功 - 支持 system + 多模态组合")
-    except Exception as e:
-        print(f"✗ 失败: {e}")
-        if "1210" in str(e):
-            print("  ⚠️  system + 多模态组合不被支持")
-            print("  建议: 将 system 内容合并到 user 消息中")
-    
+
+    success = True
+    for title, ok, note, critical in results:
+        print_section(title)
+        print(note)
+        if not ok and critical:
+            success = False
+
     print_section("诊断完成")
-    print("✅ 所有测试通过！API 工作正常")
-    return True
+    if success:
+        print("✅ 所有测试通过！API 工作正常")
+    return success
 
 if __name__ == "__main__":
-    success = test_api()
+    success = asyncio.run(test_api())
     if not success:
-        print("\n" + "=" * 70)
-        print("  请根据上述失败的测试，检查并修复问题")
-        print("=" * 70)
+        banner("  请根据上述失败的测试，检查并修复问题")
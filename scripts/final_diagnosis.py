@@ -4,35 +4,33 @@ import os
 import sys
 import json
 
-api_key = os.getenv('ZHIPU_API_KEY')
-if not api_key:
-    print("❌ 请设置 ZHIPU_API_KEY")
-    print("   export ZHIPU_API_KEY='your-api-key'")
-    sys.exit(1)
+try:
+    from scripts._common import BAR70, banner, require_api_key  # 从仓库根目录运行
+except ImportError:
+    from _common import BAR70, banner, require_api_key  # 直接在 scripts/ 目录下运行
+
+api_key = require_api_key()
 
-print("=" * 70)
-print("最终诊断 - 逐步测试")
-print("=" * 70)
+banner("最终诊断 - 逐步测试", bar=BAR70, leading='')
 print(f"API Key: {api_key[:10]}...{api_key[-4:]}\n")
 
 # ============================================================
 # 测试 1: 直接使用 OpenAI 客户端
 # ============================================================
-print("\n" + "=" * 70)
-print("测试 1: 直接使用 OpenAI 客户端（基准测试）")
-print("=" * 70)
+banner("测试 1: 直接使用 OpenAI 客户端（基准测试）")
 
-from openai import OpenAI
+try:
+    from scripts._common import cached_create, dlog, get_client  # 从仓库根目录运行
+except ImportError:
+    from _common import cached_create, dlog, get_client  # 直接在 scripts/ 目录下运行
 
-direct_client = OpenAI(
-    base_url="https://open.bigmodel.cn/api/paas/v4",
-    api_key=api_key,
-)
+direct_client = get_client(api_key)
 
 # 测试 1.1: 最简单的调用
 print("\n[1.1] 最简单的调用")
 try:
-    response = direct_client.chat.completions.create(
+    response = cached_create(
+        direct_client,
         model="glm-4v-plus",
         messages=[{"role": "user", "content": "你好"}]
     )
@@ -45,7 +43,8 @@ except Exception as e:
 # 测试 1.2: 带参数
 print("\n[1.2] 带 temperature 和 max_tokens")
 try:
-    response = direct_client.chat.completions.create(
+    response = cached_create(
+        direct_client,
         model="glm-4v-plus",
         messages=[{"role": "user", "content": "你好"}],
         temperature=0.7,
@@ -59,7 +58,8 @@ except Exception as e:
 # 测试 1.3: 带 system 消息
 print("\n[1.3] 带 system 消息")
 try:
-    response = direct_client.chat.completions.create(
+    response = cached_create(
+        direct_client,
         model="glm-4v-plus",
         messages=[
             {"role": "system", "content": "你是一个助手"},
@@ -76,9 +76,7 @@ except Exception as e:
 # ============================================================
 # 测试 2: 使用 ZhipuAPIClient
 # ============================================================
-print("\n\n" + "=" * 70)
-print("测试 2: 使用 ZhipuAPIClient（我们的封装）")
-print("=" * 70)
+banner("测试 2: 使用 ZhipuAPIClient（我们的封装）", leading='\n\n')
 
 from phone_agent.model import ZhipuAPIClient, ZhipuAPIConfig
 
@@ -97,43 +95,71 @@ client = ZhipuAPIClient(config)
 
 # 测试 2.1: 简单消息
 print("\n[2.1] 简单 user 消息")
+ok_2_1 = False
 try:
     messages = [{"role": "user", "content": "你好"}]
-    print(f"  输入: {json.dumps(messages, ensure_ascii=False)}")
+    dlog(messages)
     response = client.request(messages)
     print(f"✅ 成功")
-    print(f"  raw_content: {response.raw_content[:50]}...")
+    raw = response.raw_content or ''
+    print(f"  raw_content: {raw[:50]}...")
+    ok_2_1 = True
 except Exception as e:
     print(f"❌ 失败: {e}")
     import traceback
     traceback.print_exc()
 
-# 测试 2.2: 带 system 消息  
+# 测试 2.2: 带 system 消息（依赖 2.1：连封装的简单调用都不通时，
+# 叠加 system 消息的探测只会重复同一个失败，直接跳过）
 print("\n[2.2] system + user 消息")
-try:
-    messages = [
-        {"role": "system", "content": "你是一个助手"},
-        {"role": "user", "content": "你好"}
-    ]
-    print(f"  输入: {json.dumps(messages, ensure_ascii=False)}")
-    
-    # 启用调试查看处理后的消息
-    os.environ['DEBUG_ZHIPU_API'] = '1'
-    response = client.request(messages)
-    os.environ.pop('DEBUG_ZHIPU_API')
-    
-    print(f"✅ 成功")
-    print(f"  raw_content: {response.raw_content[:50]}...")
-except Exception as e:
-    print(f"❌ 失败: {e}")
-    print("\n分析: ZhipuAPIClient 的消息处理可能有问题")
+ok_2_2 = False
+if not ok_2_1:
+    print("⏭️  跳过 - 前置测试 2.1 未通过")
+else:
+    try:
+        messages = [
+            {"role": "system", "content": "你是一个助手"},
+            {"role": "user", "content": "你好"}
+        ]
+        dlog(messages)
+
+        # 启用调试查看处理后的消息
+        os.environ['DEBUG_ZHIPU_API'] = '1'
+        response = client.request(messages)
+        os.environ.pop('DEBUG_ZHIPU_API')
+
+        print(f"✅ 成功")
+        raw = response.raw_content or ''
+        print(f"  raw_content: {raw[:50]}...")
+        ok_2_2 = True
+    except Exception as e:
+        print(f"❌ 失败: {e}")
+        print("\n分析: ZhipuAPIClient 的消息处理可能有问题")
 
 # ============================================================
 # 测试 3: 检查消息处理逻辑
 # ============================================================
-print("\n\n" + "=" * 70)
-print("测试 3: 检查消息处理逻辑")
-print("=" * 70)
+banner("测试 3: 检查消息处理逻辑", leading='\n\n')
+
+# 2.2 已经走通说明消息处理没问题，常规路径跳过这段逐字段检查；
+# 设置 DEBUG_ZHIPU_API 可强制执行
+if ok_2_2 and not os.environ.get("DEBUG_ZHIPU_API"):
+    print("⏭️  跳过 - 测试 2.2 已通过，消息处理无需再检查")
+    banner("诊断完成")
+    sys.exit(0)
+
+import hashlib
+
+
+def _digest(message):
+    """消息的稳定摘要：先规范化 JSON 再 blake2b，比较只看 16 字节。
+
+    多模态消息的深比较要逐字节扫整段 base64 图片，摘要化后
+    相等判断是常量大小；只有真正出现差异时才做逐字段 diff。
+    """
+    payload = json.dumps(message, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
 
 print("\n测试 _process_messages 方法:")
 messages = [
@@ -144,8 +170,10 @@ processed = client._process_messages(messages)
 print(f"  原始消息: {json.dumps(messages, ensure_ascii=False)}")
 print(f"  处理后: {json.dumps(processed, ensure_ascii=False)}")
 
-# 检查是否有变化
-if messages == processed:
+# 检查是否有变化（按消息摘要比较）
+if len(messages) == len(processed) and all(
+    _digest(a) == _digest(b) for a, b in zip(messages, processed)
+):
     print("  ✓ 消息未被修改")
 else:
     print("  ⚠️  消息被修改了")
@@ -155,6 +183,4 @@ else:
             print(f"      原始: {orig}")
             print(f"      处理: {proc}")
 
-print("\n" + "=" * 70)
-print("诊断完成")
-print("=" * 70)
+banner("诊断完成")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""参数化的智谱 API 探测工具。
+
+debug_api_params / debug_zhipu_api / diagnose_and_fix / final_diagnosis
+各自重复实现了环境检查、客户端构造、文本/system/多模态探测和异常打印。
+这里把公共探测项收敛成一份声明式的 ProbeSpec 列表：加一个探测只需加
+一行数据，不用再复制 try/except/print 样板。
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    from scripts._common import BAR60, banner, TINY_PNG_DATA_URL, acall_with_retry, get_async_client, require_api_key  # 从仓库根目录运行
+except ImportError:
+    from _common import BAR60, banner, TINY_PNG_DATA_URL, acall_with_retry, get_async_client, require_api_key  # 直接在 scripts/ 目录下运行
+
+
+@dataclass(slots=True)
+class ProbeSpec:
+    """一次探测请求的声明：发什么、对哪个模型、依赖哪些前置探测。"""
+
+    name: str
+    messages: list
+    model: str = "glm-4v-plus"
+    params: dict = field(default_factory=dict)
+    # 任一前置探测失败/被跳过时，本探测直接标记跳过，不发请求
+    depends_on: tuple = ()
+
+
+_TEXT_MSG = {"role": "user", "content": "你好"}
+_SYSTEM_MSG = {"role": "system", "content": "你是一个助手"}
+_IMAGE_MSG = {
+    "role": "user",
+    "content": [
+        {"type": "text", "text": "这是什么？"},
+        {"type": "image_url", "image_url": {"url": TINY_PNG_DATA_URL}},
+    ],
+}
+
+PROBES = [
+    ProbeSpec("baseline", [_TEXT_MSG]),
+    ProbeSpec("system", [_SYSTEM_MSG, _TEXT_MSG], depends_on=("baseline",)),
+    ProbeSpec("multimodal", [_IMAGE_MSG], depends_on=("baseline",)),
+    ProbeSpec(
+        "params",
+        [_TEXT_MSG],
+        params={"temperature": 0.7, "max_tokens": 100},
+        depends_on=("baseline",),
+    ),
+    ProbeSpec(
+        "system+multimodal",
+        [_SYSTEM_MSG, _IMAGE_MSG],
+        depends_on=("system", "multimodal"),
+    ),
+]
+
+
+async def run_probe(client, spec: ProbeSpec) -> tuple[str, bool, str]:
+    """执行单个探测，返回 (名称, 是否成功, 说明)。"""
+    try:
+        response = await acall_with_retry(
+            client.chat.completions.create,
+            model=spec.model,
+            messages=spec.messages,
+            **spec.params,
+        )
+        content = response.choices[0].message.content or ""
+        return spec.name, True, f"✅ 成功: {content[:60]}"
+    except Exception as e:
+        return spec.name, False, f"❌ 失败: {str(e)[:200]}"
+
+
+async def main() -> bool:
+    api_key = require_api_key()
+    print(f"✓ API Key: {api_key[:8]}...{api_key[-4:]}")
+
+    client = get_async_client(api_key)
+
+    # 按依赖分波执行：每一波并发跑所有前置都已通过的探测，
+    # 前置失败的探测标记跳过，不再发请求
+    results: dict[str, bool | None] = {}
+    pending = list(PROBES)
+    while pending:
+        ready = [s for s in pending if all(d in results for d in s.depends_on)]
+        pending = [s for s in pending if s not in ready]
+
+        runnable = []
+        for spec in ready:
+            if all(results.get(d) for d in spec.depends_on):
+                runnable.append(spec)
+            else:
+                results[spec.name] = None
+                print(f"[{spec.name}] ⏭️  跳过 - 前置探测未通过")
+
+        for name, ok, note in await asyncio.gather(
+            *(run_probe(client, spec) for spec in runnable)
+        ):
+            results[name] = ok
+            print(f"[{name}] {note}")
+
+    banner("探测总结", BAR60)
+    for spec in PROBES:
+        ok = results.get(spec.name)
+        status = "⏭️ 跳过" if ok is None else ("✅ 通过" if ok else "❌ 失败")
+        print(f"  {spec.name}: {status}")
+
+    return all(results.get(spec.name) for spec in PROBES)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    raise SystemExit(0 if success else 1)